@@ -1,15 +1,47 @@
 import re
 import os
-from sqlalchemy import Column, DateTime
+import io
+import csv
+import codecs
+import gzip
+import json
+import mimetypes
+import hashlib
+import bisect
+import heapq
+import itertools
+import multiprocessing
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from sqlalchemy import Column, DateTime, Index, delete, event, inspect, insert as sql_insert, literal, tuple_, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DisconnectionError, IntegrityError
 from sqlalchemy.sql import func
-from sqlmodel import SQLModel, Field, create_engine, Session, select
+from sqlmodel import SQLModel, Field, create_engine, Session, select, text
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from dotenv import load_dotenv
-from datetime import datetime
-from flask import Flask, flash, redirect, render_template, request, url_for, jsonify, session, current_app
+from datetime import datetime, timedelta, timezone
+from flask import Flask, flash, redirect, render_template, request, url_for, jsonify, session, current_app, make_response, g, get_flashed_messages, has_request_context, send_from_directory, Response, stream_with_context
+from flask.signals import before_render_template, template_rendered
+from markupsafe import Markup, escape
 import logging
+import click
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
-from flask_wtf.csrf import CSRFProtect
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import redis
+except ImportError:
+    redis = None
+from flask_wtf.csrf import CSRFProtect, generate_csrf
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SubmitField
 from wtforms.validators import DataRequired, length, EqualTo
@@ -23,19 +55,373 @@ db = os.getenv("SQL_DB") or os.getenv("DATABASE_URL") or "sqlite:///germanflaska
 csrf = CSRFProtect(app)
 
 
-engine = create_engine(db, echo=False, pool_recycle=280, pool_pre_ping=True)
+# connection pool; DB_PRE_PING is "always" (ping on every checkout), "idle" (only
+# connections that sat in the pool longer than DB_PRE_PING_IDLE seconds) or "off"
+db_url = make_url(db)
+DB_PRE_PING = os.getenv('DB_PRE_PING', 'idle')
+DB_PRE_PING_IDLE = int(os.getenv('DB_PRE_PING_IDLE', '30'))
+engine_options = {
+    'echo': False,
+    'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '280')),
+    'pool_pre_ping': DB_PRE_PING == 'always',
+}
+if not (db_url.get_backend_name() == 'sqlite' and db_url.database in (None, '', ':memory:')):
+    engine_options.update(
+        pool_size=int(os.getenv('DB_POOL_SIZE', '5')),
+        max_overflow=int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        pool_timeout=int(os.getenv('DB_POOL_TIMEOUT', '30')),
+    )
 
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL').upper(),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL').upper(),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', '5000')),
+}
 
-<<<<<<< HEAD
 
-@app.route('/unsupported')
-def unsupported():
-    return render_template('unsupported.html')
-=======
-app.config['MOBILE_ONLY'] = os.getenv('MOBILE_ONLY', '0') == '1'
+if db_url.get_backend_name() == 'sqlite':
+    if SQLITE_PRAGMAS['journal_mode'] not in ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'):
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {SQLITE_PRAGMAS['journal_mode']}")
+    if SQLITE_PRAGMAS['synchronous'] not in ('OFF', 'NORMAL', 'FULL', 'EXTRA'):
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {SQLITE_PRAGMAS['synchronous']}")
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def mark_checkin(dbapi_connection, connection_record):
+    connection_record.info['checked_in_at'] = time.monotonic()
+
+
+def track_checkout(dbapi_connection, connection_record, connection_proxy):
+    if has_request_context():
+        g.db_checkouts = g.get('db_checkouts', 0) + 1
+
+    checked_in_at = connection_record.info.get('checked_in_at')
+    if DB_PRE_PING != 'idle' or checked_in_at is None or time.monotonic() - checked_in_at <= DB_PRE_PING_IDLE:
+        return
+
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT 1")
+    except Exception as error:
+        # the pool discards this connection and retries the checkout with a new one
+        raise DisconnectionError() from error
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
 
+def get_engine():
+    # created on first use rather than at import, so importing the module (CLI,
+    # scripts, gunicorn's master with preload_app) opens no database connection
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                new_engine = create_engine(db, **engine_options)
+                if db_url.get_backend_name() == 'sqlite':
+                    event.listen(new_engine, "connect", set_sqlite_pragmas)
+                event.listen(new_engine, "checkin", mark_checkin)
+                event.listen(new_engine, "checkout", track_checkout)
+                event.listen(new_engine, "before_cursor_execute", start_query_timer)
+                event.listen(new_engine, "after_cursor_execute", stop_query_timer)
+                _engine = new_engine
+    return _engine
 
->>>>>>> dae0b22db5d8a28c9f204dfe4e4b557cba901ceb
+
+def dispose_engine():
+    # called in each forked worker: drop pooled connections inherited from the
+    # master without closing them, since the master still owns the sockets
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+
+def get_session():
+    # one session per request (or CLI command), closed in close_request_session
+    if 'db_session' not in g:
+        g.db_session = Session(get_engine(), expire_on_commit=False)
+    return g.db_session
+
+
+@contextmanager
+def request_session():
+    db_session = get_session()
+    try:
+        yield db_session
+    except Exception:
+        db_session.rollback()
+        raise
+
+
+@app.teardown_appcontext
+def close_request_session(exc):
+    if g.get('session_streamed'):
+        # closed by the streamed response once the server is done with it
+        return
+    db_session = g.pop('db_session', None)
+    if db_session is not None:
+        db_session.close()
+
+
+@app.after_request
+def add_checkout_header(response):
+    checkouts = g.get('db_checkouts', 0)
+    response.headers['X-DB-Checkouts'] = str(checkouts)
+    # counted by the query timers below, up to the start of the response
+    response.headers['X-DB-Queries'] = str(g.get('db_queries', 0))
+    if checkouts > 1:
+        logging.debug("%s connection checkouts for %s %s", checkouts, request.method, request.path)
+    return response
+
+
+
+class RequestMetrics:
+    """Per-process request metrics rendered in the Prometheus text format.
+
+    Latency is a cumulative histogram per (method, endpoint); DB queries, DB
+    time, template render time and response bytes are summed per route.
+    """
+
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._routes = {}
+        self._statuses = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, method, endpoint, status, duration, db_queries, db_seconds, template_seconds, response_bytes):
+        with self._lock:
+            route = self._routes.get((method, endpoint))
+            if route is None:
+                route = self._routes[(method, endpoint)] = {
+                    'buckets': [0] * len(self.BUCKETS), 'count': 0, 'seconds': 0.0, 'db_queries': 0,
+                    'db_seconds': 0.0, 'template_seconds': 0.0, 'response_bytes': 0,
+                }
+            bucket = bisect.bisect_left(self.BUCKETS, duration)
+            if bucket < len(self.BUCKETS):
+                route['buckets'][bucket] += 1
+            route['count'] += 1
+            route['seconds'] += duration
+            route['db_queries'] += db_queries
+            route['db_seconds'] += db_seconds
+            route['template_seconds'] += template_seconds
+            route['response_bytes'] += response_bytes
+            self._statuses[(method, endpoint, status)] += 1
+
+    def render(self, extra=()):
+        with self._lock:
+            routes = {key: dict(route, buckets=list(route['buckets'])) for key, route in self._routes.items()}
+            statuses = dict(self._statuses)
+
+        lines = [
+            "# HELP http_requests_total Requests by route and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, endpoint, status), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{{method="{method}",endpoint="{endpoint}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, endpoint), route in sorted(routes.items()):
+            labels = f'method="{method}",endpoint="{endpoint}"'
+            for bound, cumulative in zip(self.BUCKETS, itertools.accumulate(route['buckets'])):
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {route["count"]}')
+            lines.append(f'http_request_duration_seconds_sum{{{labels}}} {route["seconds"]:.6f}')
+            lines.append(f'http_request_duration_seconds_count{{{labels}}} {route["count"]}')
+
+        for name, key, help_text in (
+            ("http_request_db_queries_total", 'db_queries', "SQL statements executed by route."),
+            ("http_request_db_seconds_total", 'db_seconds', "Time spent in SQL statements by route."),
+            ("http_request_template_seconds_total", 'template_seconds', "Template render time by route."),
+            ("http_response_bytes_total", 'response_bytes', "Response body bytes by route; streamed pages count them before compression."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (method, endpoint), route in sorted(routes.items()):
+                lines.append(f'{name}{{method="{method}",endpoint="{endpoint}"}} {round(route[key], 6)}')
+
+        # extra holds process-level (name, type, value, help) samples such as cache and pool stats
+        for name, kind, value, help_text in extra:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
+
+
+def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    if not has_request_context() or 'request_started' not in g:
+        return
+    g.db_queries += 1
+    g.db_seconds += elapsed
+    if g.sql_log is not None:
+        g.sql_log.append((elapsed, statement))
+
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+
+@template_rendered.connect_via(app)
+def stop_template_timer(sender, template, context, **extra):
+    started = g.pop('template_started', None)
+    if started is not None:
+        g.template_seconds = g.get('template_seconds', 0.0) + time.perf_counter() - started
+
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+    g.sql_log = [] if app.config['SLOW_REQUEST_MS'] else None
+
+
+def record_request_metrics(status, response_bytes):
+    if g.get('metrics_recorded') or 'request_started' not in g:
+        return
+    g.metrics_recorded = True
+    duration = time.perf_counter() - g.request_started
+    endpoint = request.endpoint or 'unmatched'
+    request_metrics.observe(request.method, endpoint, status, duration, g.db_queries, g.db_seconds,
+                            g.get('template_seconds', 0.0), response_bytes)
+
+    slow_ms = app.config['SLOW_REQUEST_MS']
+    if slow_ms and duration * 1000 >= slow_ms:
+        statements = "\n".join(f"  {elapsed * 1000:.1f} ms  {' '.join(statement.split())[:500]}"
+                                for elapsed, statement in g.sql_log)
+        logging.warning("Slow request %s %s: %.1f ms, %s queries (%.1f ms)\n%s", request.method, request.path,
+                        duration * 1000, g.db_queries, g.db_seconds * 1000, statements)
+
+
+@app.after_request
+def record_response_metrics(response):
+    if g.get('metrics_deferred'):
+        # streamed pages record themselves once the last chunk is sent
+        return response
+    record_request_metrics(response.status_code, response.calculate_content_length() or 0)
+    return response
+
+
+@app.teardown_request
+def record_failed_request_metrics(exc):
+    # after_request handlers are skipped when a view raises
+    if exc is not None:
+        record_request_metrics(500, 0)
+
+
+COMPRESSIBLE_MIMETYPES = {'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript',
+                          'application/javascript', 'application/json', 'application/x-ndjson'}
+
+
+@app.after_request
+def compress_response(response):
+    # registered after record_response_metrics, so it runs first and the
+    # metrics see the compressed size
+    if (response.direct_passthrough or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    if response.is_streamed:
+        return compress_streamed_response(response)
+
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    if brotli is not None and request.accept_encodings['br']:
+        encoding, data = 'br', brotli.compress(data, quality=app.config['COMPRESS_BROTLI_QUALITY'])
+    elif request.accept_encodings['gzip']:
+        encoding, data = 'gzip', gzip.compress(data, compresslevel=app.config['COMPRESS_GZIP_LEVEL'])
+    else:
+        return response
+
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # the encoded bytes differ from the identity representation
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def compress_streamed_response(response):
+    if brotli is not None and request.accept_encodings['br']:
+        encoding = 'br'
+    elif request.accept_encodings['gzip']:
+        encoding = 'gzip'
+    else:
+        return response
+    response.response = compress_chunks(response.response, encoding)
+    response.headers['Content-Encoding'] = encoding
+    response.headers.pop('Content-Length', None)
+    return response
+
+
+def compress_chunks(chunks, encoding):
+    # every chunk is flushed through the compressor, so what the app has
+    # produced so far reaches the client instead of waiting in the buffer
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=app.config['COMPRESS_BROTLI_QUALITY'])
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(app.config['COMPRESS_GZIP_LEVEL'], zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        compress, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+    try:
+        for chunk in chunks:
+            data = compress(chunk.encode() if isinstance(chunk, str) else chunk) + flush()
+            if data:
+                yield data
+        yield finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+
+app.config['MOBILE_ONLY'] = os.getenv('MOBILE_ONLY', '0') == '1'
+app.config['WORDS_PAGE_SIZE'] = int(os.getenv('WORDS_PAGE_SIZE', '100'))
+app.config['NOTES_PAGE_SIZE'] = int(os.getenv('NOTES_PAGE_SIZE', '30'))
+app.config['NOTES_PREVIEW_LENGTH'] = int(os.getenv('NOTES_PREVIEW_LENGTH', '200'))
+app.config['IMPORT_CHUNK_SIZE'] = int(os.getenv('IMPORT_CHUNK_SIZE', '1000'))
+# ids bound per IN list, below SQLite's limit of 999 variables before 3.32
+app.config['ID_CHUNK_SIZE'] = int(os.getenv('ID_CHUNK_SIZE', '500'))
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', str(16 * 1024 * 1024)))
+# log requests slower than this with their SQL statements; 0 disables the log
+app.config['SLOW_REQUEST_MS'] = int(os.getenv('SLOW_REQUEST_MS', '0'))
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+app.config['SYNC_PAGE_SIZE'] = int(os.getenv('SYNC_PAGE_SIZE', '500'))
+app.config['EXPORT_CHUNK_SIZE'] = int(os.getenv('EXPORT_CHUNK_SIZE', '1000'))
+# number of proxies in front of the app (Heroku router: 1) whose X-Forwarded-For
+# is trusted, so rate limits see the client's address instead of the proxy's
+app.config['PROXY_FIX_X_FOR'] = int(os.getenv('PROXY_FIX_X_FOR', '0'))
+if app.config['PROXY_FIX_X_FOR']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
+# negotiated br/gzip for rendered pages and JSON; smaller bodies are sent as is
+app.config['COMPRESS_MIN_SIZE'] = int(os.getenv('COMPRESS_MIN_SIZE', '500'))
+app.config['COMPRESS_GZIP_LEVEL'] = int(os.getenv('COMPRESS_GZIP_LEVEL', '6'))
+app.config['COMPRESS_BROTLI_QUALITY'] = int(os.getenv('COMPRESS_BROTLI_QUALITY', '5'))
+# template output events collected into one chunk of a streamed page
+app.config['STREAM_BUFFER_EVENTS'] = int(os.getenv('STREAM_BUFFER_EVENTS', '8'))
 
 
 class User(UserMixin, SQLModel, table=True):
@@ -44,13 +430,39 @@ class User(UserMixin, SQLModel, table=True):
     password: str = Field(nullable=False, max_length=500)
 
 class GermanWords(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_germanwords_user_id_user_word_id", "user_id", "user_word_id"),
+        Index("ix_germanwords_user_id_due_at", "user_id", "due_at"),
+        Index("ix_germanwords_user_id_sync_version", "user_id", "sync_version"),
+    )
+
     id: int = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     user_word_id: int = Field(default=None, max_length=50)
-    german_word: str = Field(nullable=False, max_length=100)
-    german_translated_word: str = Field(nullable=False, max_length=100)
+    german_word: str = Field(nullable=False, max_length=100, index=True)
+    german_translated_word: str = Field(nullable=False, max_length=100, index=True)
+    # SM-2 review schedule
+    ease_factor: float = Field(default=2.5, nullable=False, sa_column_kwargs={"server_default": "2.5"})
+    interval_days: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    repetitions: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    due_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True))
+    )
+    # delta sync: per-user table version of the last write (see bump_data_version)
+    sync_version: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True))
+    )
 
 class Notes(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_notes_user_id_created_at", "user_id", "created_at"),
+        Index("ix_notes_user_id_user_note_id", "user_id", "user_note_id"),
+        Index("ix_notes_user_id_sync_version", "user_id", "sync_version"),
+    )
+
     id: int = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     user_note_id: int = Field(default=None, max_length=50)
@@ -60,18 +472,73 @@ class Notes(SQLModel, table=True):
         default_factory=datetime.utcnow,
         sa_column=Column(DateTime(timezone=True))
     )
+    # delta sync: per-user table version of the last write (see bump_data_version)
+    sync_version: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True))
+    )
 
 class SchweizWords(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_schweizwords_user_id_user_word_id", "user_id", "user_word_id"),
+        Index("ix_schweizwords_user_id_due_at", "user_id", "due_at"),
+        Index("ix_schweizwords_user_id_sync_version", "user_id", "sync_version"),
+    )
+
     id: int = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     user_word_id: int = Field(default=None, max_length=50)
-    schweiz_word: str = Field(nullable=False, max_length=100)
+    schweiz_word: str = Field(nullable=False, max_length=100, index=True)
     schweiz_translated_german_word: str = Field(nullable=False, max_length=100)
     schweiz_translated_word: str = Field(nullable=False, max_length=100)
+    # SM-2 review schedule
+    ease_factor: float = Field(default=2.5, nullable=False, sa_column_kwargs={"server_default": "2.5"})
+    interval_days: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    repetitions: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    due_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True))
+    )
+    # delta sync: per-user table version of the last write (see bump_data_version)
+    sync_version: int = Field(default=0, nullable=False, sa_column_kwargs={"server_default": "0"})
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True))
+    )
+
+class UserCounter(SQLModel, table=True):
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    name: str = Field(primary_key=True, max_length=50)
+    value: int = Field(default=0, nullable=False)
+
+class Tombstone(SQLModel, table=True):
+    # one row per deleted word or note, so /sync can tell clients what to drop
+    __table_args__ = (
+        Index("ix_tombstone_user_id_table_name_sync_version", "user_id", "table_name", "sync_version"),
+    )
+
+    id: int = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    table_name: str = Field(nullable=False, max_length=50)
+    row_id: int = Field(nullable=False)
+    sync_version: int = Field(nullable=False)
+    deleted_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True))
+    )
+
+class SchemaMigration(SQLModel, table=True):
+    version: int = Field(primary_key=True)
+    description: str = Field(nullable=False, max_length=200)
+    applied_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column=Column(DateTime(timezone=True))
+    )
 
 class irregularVerbs(SQLModel, table=True):
     id: int = Field(default=None, primary_key=True)
-    infinitive: str = Field(nullable=False, max_length=100)
+    infinitive: str = Field(nullable=False, max_length=100, index=True)
     second_third_infinitive: str = Field(nullable=False, max_length=100)
     preterit: str = Field(nullable=False, max_length=100)
     perfekt: str = Field(nullable=False, max_length=100)
@@ -93,7 +560,741 @@ class RegisterForm(FlaskForm):
     submit = SubmitField('Register')
 
 
-SQLModel.metadata.create_all(engine)
+WORD_TABLES = {
+    'GermanWords': {
+        'model': GermanWords,
+        'columns': ["german_word", "german_translated_word"],
+        'user_id': 'user_id',
+        'rows_template': 'insert_rows.html'
+    },
+    'SchweizWords': {
+        'model': SchweizWords,
+        'columns': ["schweiz_word", "schweiz_translated_german_word", "schweiz_translated_word"],
+        'user_id': 'user_id',
+        'rows_template': 'schweiz_rows.html'
+    },
+}
+
+# tables mirrored by /sync and the columns sent besides id, sync_version and updated_at
+SYNC_TABLES = {
+    'GermanWords': (GermanWords, ['user_word_id', *WORD_TABLES['GermanWords']['columns']]),
+    'SchweizWords': (SchweizWords, ['user_word_id', *WORD_TABLES['SchweizWords']['columns']]),
+    'Notes': (Notes, ['user_note_id', 'title', 'body', 'created_at']),
+}
+
+COUNTER_COLUMNS = {
+    'GermanWords': (GermanWords, 'user_word_id'),
+    'SchweizWords': (SchweizWords, 'user_word_id'),
+    'Notes': (Notes, 'user_note_id'),
+}
+
+
+SEARCH_TABLES = {
+    **WORD_TABLES,
+    'irregularVerbs': {
+        'model': irregularVerbs,
+        'columns': ["infinitive", "second_third_infinitive", "preterit", "perfekt", "translation"],
+        'user_id': None
+    },
+}
+
+
+class WordSearchIndex:
+    """In-process n-gram index over the word tables, one bucket per (table, user).
+
+    Every column value is indexed by its 1..3-grams and by its 1..3-character
+    prefixes. Buckets are built lazily on the first search and remember the
+    data version they were loaded at. A search passes the current version; a
+    bucket behind it, such as after a write by another worker, catches up on
+    the rows stamped with a newer sync_version and the tombstones written
+    since, and is only rebuilt when those tombstones were pruned. The worker
+    that made a write updates its bucket in place through refresh() and
+    discard(). Loads of one bucket are serialized, so concurrent searches wait
+    for one load instead of each running it. At most max_rows rows are kept
+    over all buckets, the least recently searched buckets are dropped first.
+    The irregular verbs have no sync_version and are rebuilt when they reload.
+    """
+
+    GRAM_SIZE = 3
+
+    def __init__(self, max_rows=100_000):
+        self.max_rows = max_rows
+        self.rebuilds = 0
+        self.catch_ups = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+
+    @classmethod
+    def _keys(cls, values):
+        grams, prefixes = set(), set()
+        for value in values:
+            value = value.lower()
+            for size in range(1, cls.GRAM_SIZE + 1):
+                grams.update(value[i:i + size] for i in range(len(value) - size + 1))
+                if len(value) >= size:
+                    prefixes.add(value[:size])
+        return grams, prefixes
+
+    def _index_row(self, bucket, row_id, position, values):
+        bucket['rows'][row_id] = (position, values)
+        bisect.insort(bucket['positions'], position)
+        grams, prefixes = self._keys(values)
+        for gram in grams:
+            bucket['grams'][gram].add(row_id)
+        for prefix in prefixes:
+            bucket['prefixes'][prefix].add(row_id)
+
+    def _unindex_row(self, bucket, row_id):
+        entry = bucket['rows'].pop(row_id, None)
+        if entry is None:
+            return
+        positions = bucket['positions']
+        index = bisect.bisect_left(positions, entry[0])
+        if index < len(positions) and positions[index] == entry[0]:
+            del positions[index]
+        grams, prefixes = self._keys(entry[1])
+        for index, keys in (('grams', grams), ('prefixes', prefixes)):
+            for key in keys:
+                ids = bucket[index].get(key)
+                if ids is not None:
+                    ids.discard(row_id)
+                    if not ids:
+                        del bucket[index][key]
+
+    @staticmethod
+    def _position_column(model):
+        return getattr(model, 'user_word_id', model.id)
+
+    def _fetch(self, table_name, user_id, since=None):
+        # (version, rows, deleted ids) read in one session: the rows stamped
+        # after since, or every row (deleted None) for a full build. The
+        # version is read first, so anything the queries see beyond it is
+        # applied again by the next catch-up
+        table_info = SEARCH_TABLES[table_name]
+        model = table_info['model']
+        query = select(model.id, self._position_column(model),
+                       *(getattr(model, column) for column in table_info['columns']))
+        with Session(get_engine()) as session:
+            if user_id is None:
+                return None, session.exec(query).all(), None
+            query = query.where(getattr(model, table_info['user_id']) == user_id)
+            version = get_data_version(session, user_id, table_name)
+            pruned = session.exec(select(UserCounter.value).where(
+                UserCounter.user_id == user_id, UserCounter.name == f"{table_name}:pruned"
+            )).first() or 0
+            if since is None or since < pruned:
+                return version, session.exec(query).all(), None
+            deleted = session.exec(select(Tombstone.row_id).where(
+                Tombstone.user_id == user_id, Tombstone.table_name == table_name,
+                Tombstone.sync_version > since
+            )).all()
+            return version, session.exec(query.where(model.sync_version > since)).all(), deleted
+
+    @staticmethod
+    def _is_current(bucket, user_id, version):
+        if bucket is None:
+            return False
+        if user_id is None:
+            return bucket['version'] == version
+        return bucket['version'] >= version
+
+    def _bucket(self, table_name, user_id, version):
+        key = (table_name, user_id)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                self._buckets.move_to_end(key)
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        if self._is_current(bucket, user_id, version):
+            return bucket
+
+        with load_lock:
+            with self._lock:
+                bucket = self._buckets.get(key)
+            if self._is_current(bucket, user_id, version):
+                return bucket
+
+            since = bucket['version'] if bucket is not None and user_id is not None else None
+            loaded, rows, deleted = self._fetch(table_name, user_id, since)
+            if user_id is None:
+                loaded = version
+            with self._lock:
+                if deleted is None:
+                    bucket = {'rows': {}, 'grams': defaultdict(set), 'prefixes': defaultdict(set),
+                              'positions': []}
+                    self.rebuilds += 1
+                else:
+                    # deletes first: SQLite may hand a deleted id to a later insert
+                    for row_id in deleted:
+                        self._unindex_row(bucket, row_id)
+                    self.catch_ups += 1
+                for row_id, position, *values in rows:
+                    self._unindex_row(bucket, row_id)
+                    self._index_row(bucket, row_id, position or row_id, tuple(value or '' for value in values))
+                bucket['version'] = loaded
+                self._buckets[key] = bucket
+                self._buckets.move_to_end(key)
+                self._evict()
+        return bucket
+
+    def _evict(self):
+        # drop the least recently searched buckets until the rows fit, but
+        # never the one just used. Call with the lock held
+        total = sum(len(bucket['rows']) for bucket in self._buckets.values())
+        while total > self.max_rows and len(self._buckets) > 1:
+            key, bucket = self._buckets.popitem(last=False)
+            self._load_locks.pop(key, None)
+            total -= len(bucket['rows'])
+
+    def _advance(self, key, version):
+        # the loaded bucket if the write at version is the next one it misses,
+        # which it then moves to; any other bucket is left for the next search
+        # to catch up. Call with the lock held
+        bucket = self._buckets.get(key)
+        if bucket is None or bucket['version'] != version - 1:
+            return None
+        bucket['version'] = version
+        return bucket
+
+    def search(self, table_name, user_id, query, limit=50, version=0):
+        """Return up to limit (ordinal, id, values) hits, prefix matches first.
+
+        version is the table's current data version for user_id; a bucket
+        behind it catches up before the search.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        bucket = self._bucket(table_name, user_id, version)
+        with self._lock:
+            rows = bucket['rows']
+            if len(query) <= self.GRAM_SIZE:
+                # short queries are exact keys, so the postings need no verification
+                prefix_ids = bucket['prefixes'].get(query, set())
+                substring_ids = bucket['grams'].get(query, set()) - prefix_ids
+            else:
+                grams = [query[i:i + self.GRAM_SIZE] for i in range(len(query) - self.GRAM_SIZE + 1)]
+                postings = sorted((bucket['grams'].get(gram, set()) for gram in grams), key=len)
+                candidates = postings[0].intersection(*postings[1:])
+                prefix_ids, substring_ids = set(), set()
+                for row_id in candidates:
+                    values = [value.lower() for value in rows[row_id][1]]
+                    if any(value.startswith(query) for value in values):
+                        prefix_ids.add(row_id)
+                    elif any(query in value for value in values):
+                        substring_ids.add(row_id)
+
+            hits = []
+            for ids in (prefix_ids, substring_ids):
+                if len(hits) >= limit:
+                    break
+                for row_id in heapq.nsmallest(limit - len(hits), ids, key=lambda row_id: rows[row_id][0]):
+                    position, values = rows[row_id]
+                    ordinal = bisect.bisect_left(bucket['positions'], position) + 1
+                    hits.append((ordinal, row_id, values))
+        return hits
+
+    def refresh(self, table_name, user_id, row):
+        """Re-index one committed insert or update, stamped with row.sync_version."""
+        columns = SEARCH_TABLES[table_name]['columns']
+        values = tuple(getattr(row, column) or '' for column in columns)
+        position = getattr(row, 'user_word_id', None) or row.id
+        with self._lock:
+            bucket = self._advance((table_name, user_id), row.sync_version)
+            if bucket is not None:
+                self._unindex_row(bucket, row.id)
+                self._index_row(bucket, row.id, position, values)
+                self._evict()
+
+    def discard(self, table_name, user_id, row_ids, version):
+        """Remove committed deletes, made at data version version."""
+        with self._lock:
+            bucket = self._advance((table_name, user_id), version)
+            if bucket is not None:
+                for row_id in row_ids:
+                    self._unindex_row(bucket, row_id)
+
+    def invalidate(self, table_name, user_id=None):
+        with self._lock:
+            self._buckets.pop((table_name, user_id), None)
+
+    def stats(self):
+        with self._lock:
+            return {"size": len(self._buckets), "rows": sum(len(bucket['rows']) for bucket in self._buckets.values()),
+                    "rebuilds": self.rebuilds, "catch_ups": self.catch_ups}
+
+
+search_index = WordSearchIndex(max_rows=int(os.getenv('SEARCH_INDEX_ROWS', '100000')))
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache whose entries expire after ttl seconds."""
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[1] < time.monotonic():
+                if item is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self._data), "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+# detached User rows for Flask-Login; every path that changes or removes a user
+# (logout, password change, deletion) must call invalidate_cached_user()
+user_cache = LRUCache(maxsize=int(os.getenv('USER_CACHE_SIZE', '1024')),
+                      ttl=int(os.getenv('USER_CACHE_TTL', '60')))
+
+
+def invalidate_cached_user(user_id):
+    user_cache.invalidate(int(user_id))
+
+
+# rendered first page of a user's word table, keyed by (user_id, table, data
+# version); writes bump the version instead of deleting entries
+class RedisCache:
+    """LRUCache's interface on a Redis server shared by every worker process.
+
+    Keys are namespaced with prefix and values stored as JSON with ttl as
+    their expiry. Redis bounds the memory: run it with maxmemory and
+    maxmemory-policy allkeys-lru. When Redis is unreachable, lookups miss
+    and writes are dropped instead of failing the request.
+    """
+
+    def __init__(self, client, prefix, ttl=300):
+        self.client = client
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, key):
+        parts = key if isinstance(key, tuple) else (key,)
+        return self.prefix + ":".join(str(part) for part in parts)
+
+    def get(self, key):
+        try:
+            raw = self.client.get(self._key(key))
+        except redis.RedisError as error:
+            self.errors += 1
+            logging.warning("Cache lookup failed for %s: %s", self._key(key), error)
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key, value):
+        try:
+            self.client.set(self._key(key), json.dumps(value), ex=self.ttl)
+        except redis.RedisError as error:
+            self.errors += 1
+            logging.warning("Cache write failed for %s: %s", self._key(key), error)
+
+    def invalidate(self, key):
+        try:
+            self.client.delete(self._key(key))
+        except redis.RedisError as error:
+            self.errors += 1
+            logging.warning("Cache invalidation failed for %s: %s", self._key(key), error)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + "*", count=1000))
+        for start in range(0, len(keys), 1000):
+            self.client.delete(*keys[start:start + 1000])
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"size": None, "hits": self.hits, "misses": self.misses, "errors": self.errors,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+# CACHE_URL picks where the per-user caches live: memory:// (default) keeps an
+# LRUCache in each worker process, redis://host:6379/0 shares one Redis between
+# all workers, and fakeredis:// runs the Redis code path in process for tests
+CACHE_URL = os.getenv('CACHE_URL', 'memory://')
+CACHE_PREFIX = os.getenv('CACHE_PREFIX', 'germanflaskapp:')
+_cache_clients = {}
+
+
+def make_cache(name, maxsize, ttl):
+    if CACHE_URL.startswith('memory://'):
+        return LRUCache(maxsize=maxsize, ttl=ttl)
+    if redis is None:
+        raise RuntimeError("CACHE_URL needs the redis package (pip install redis).")
+
+    client = _cache_clients.get(CACHE_URL)
+    if client is None:
+        if CACHE_URL.startswith('fakeredis://'):
+            import fakeredis
+            client = fakeredis.FakeRedis()
+        else:
+            # redis-py reconnects after a fork, so the client can be created before gunicorn forks
+            client = redis.Redis.from_url(CACHE_URL, socket_timeout=float(os.getenv('CACHE_TIMEOUT', '0.25')))
+        _cache_clients[CACHE_URL] = client
+    return RedisCache(client, prefix=f"{CACHE_PREFIX}{name}:", ttl=ttl)
+
+
+# rendered first pages of the word tables, keyed by (user, table, data version)
+fragment_cache = make_cache('fragment', maxsize=int(os.getenv('FRAGMENT_CACHE_SIZE', '512')),
+                            ttl=int(os.getenv('FRAGMENT_CACHE_TTL', '600')))
+# version stamps of global data, such as the irregular verbs, that other processes change
+stamp_cache = make_cache('stamp', maxsize=64, ttl=int(os.getenv('STAMP_CACHE_TTL', '86400')))
+
+
+class HasherBusy(Exception):
+    pass
+
+
+class PasswordHasher:
+    """Runs werkzeug's password hashing in a small process pool.
+
+    At most `workers` hashes run at once, each on its own core, and at most
+    `queue` more wait for one; beyond that hash() and verify() raise HasherBusy
+    instead of letting an auth burst pile up behind the pool. So does a hash
+    that outlasts `timeout`, or a pool whose worker died, which is replaced on
+    the next call. The pool is created lazily in each serving process, so it
+    is never inherited across gunicorn's fork. workers=0 hashes inline.
+    """
+
+    def __init__(self, method, workers=2, queue=16, timeout=10.0, start_method='spawn'):
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(workers + queue) if workers > 0 else None
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context(self.start_method))
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _discard(self, pool):
+        # a pool whose worker died stays broken; the next call starts a new one
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, function, *args):
+        if self._slots is None:
+            return function(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+        pool = self._executor()
+        try:
+            future = pool.submit(function, *args)
+        except (BrokenProcessPool, RuntimeError):
+            self._slots.release()
+            logging.exception("Password hash pool unusable, starting a new one.")
+            self._discard(pool)
+            raise HasherBusy()
+        # the slot is held until the task leaves the pool, not until the
+        # caller stops waiting, so a slow pool stays bounded by workers + queue
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            logging.warning("Password hash took longer than %ss.", self.timeout)
+            raise HasherBusy()
+        except BrokenProcessPool:
+            logging.exception("Password hash pool broke, starting a new one.")
+            self._discard(pool)
+            raise HasherBusy()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        # werkzeug stores the full method ("scrypt:32768:8:1") before the first "$"
+        return password_hash.split("$", 1)[0] != self.method
+
+
+# PASSWORD_HASH_METHOD is the work factor, e.g. "scrypt:65536:8:1" or
+# "pbkdf2:sha256:1000000"; older hashes are upgraded on the next login
+password_hasher = PasswordHasher(
+    method=os.getenv('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1'),
+    workers=int(os.getenv('PASSWORD_HASH_WORKERS', '2')),
+    queue=int(os.getenv('PASSWORD_HASH_QUEUE', '16')),
+    timeout=float(os.getenv('PASSWORD_HASH_TIMEOUT', '10')),
+)
+
+
+class TokenBucketLimiter:
+    """Thread-safe in-process token buckets, one per key (client IP, username).
+
+    A bucket holds up to `capacity` tokens and refills at capacity/per tokens a
+    second. Only the max_keys most recently used buckets are kept; a dropped
+    bucket simply starts full again.
+    """
+
+    def __init__(self, capacity, per, max_keys=10000):
+        self.capacity = capacity
+        self.rate = capacity / per
+        self.max_keys = max_keys
+        self.rejected = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, tokens=1):
+        # returns 0 when the tokens were taken, else the seconds until they are back
+        now = time.monotonic()
+        with self._lock:
+            available, updated_at = self._buckets.get(key, (self.capacity, now))
+            available = min(self.capacity, available + (now - updated_at) * self.rate)
+            if available >= tokens:
+                available -= tokens
+                wait = 0
+            else:
+                self.rejected += 1
+                wait = (tokens - available) / self.rate
+            self._buckets[key] = (available, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+def parse_rate(value):
+    # "10/60" -> 10 tokens per 60 seconds
+    capacity, per = value.split("/")
+    return int(capacity), float(per)
+
+
+# login/register attempts; per worker process, so the effective limit is
+# multiplied by the number of gunicorn workers
+auth_ip_limiter = TokenBucketLimiter(*parse_rate(os.getenv('AUTH_RATE_PER_IP', '20/60')))
+auth_user_limiter = TokenBucketLimiter(*parse_rate(os.getenv('AUTH_RATE_PER_USER', '5/60')))
+
+
+def auth_throttled(username=None):
+    # seconds the client has to wait, 0 if the attempt may go ahead
+    wait = auth_ip_limiter.consume(request.remote_addr or "unknown")
+    if username is not None:
+        wait = max(wait, auth_user_limiter.consume(username.lower()))
+    return wait
+
+
+def auth_refused(template, form, message, status, retry_after=None):
+    flash(message, 'error')
+    response = make_response(render_template(template, form=form), status)
+    if retry_after:
+        response.headers['Retry-After'] = str(int(retry_after) + 1)
+    return response
+
+
+class IrregularVerbsCache:
+    """Process-wide cache of the irregular verbs and their rendered table rows.
+
+    The verbs are global reference data, so one copy is shared by every user.
+    Each load gets a new version stamp; invalidate() drops it so the next
+    request reloads, and entries older than ttl seconds are reloaded as well
+    in case another worker or process changed the table. invalidate() also
+    publishes a new stamp in stamps; with a shared cache backend every worker
+    sees it and reloads on its next request.
+    """
+
+    STAMP_KEY = 'irregularVerbs'
+
+    def __init__(self, ttl=3600, stamps=None):
+        self.ttl = ttl
+        self.stamps = stamps
+        self._entry = None
+        self._version = 0
+        self._lock = threading.Lock()
+
+    def _is_current(self, entry, stamp):
+        return entry is not None and entry['stamp'] == stamp and time.monotonic() - entry['loaded_at'] <= self.ttl
+
+    def get(self):
+        stamp = self.stamps.get(self.STAMP_KEY) if self.stamps is not None else None
+        entry = self._entry
+        if self._is_current(entry, stamp):
+            return entry
+
+        with self._lock:
+            entry = self._entry
+            if not self._is_current(entry, stamp):
+                with Session(get_engine()) as session:
+                    verbs = session.exec(select(irregularVerbs).order_by(irregularVerbs.id)).all()
+                rows_html = Markup(render_template('irregular_rows.html', verbs=verbs))
+                self._version += 1
+                entry = {
+                    'version': self._version,
+                    'verbs': verbs,
+                    'rows_html': rows_html,
+                    'digest': hashlib.sha1(rows_html.encode('utf-8')).hexdigest()[:16],
+                    'last_modified': datetime.now(timezone.utc).replace(microsecond=0),
+                    'loaded_at': time.monotonic(),
+                    'stamp': stamp,
+                }
+                self._entry = entry
+                logging.info("Irregular verbs cache loaded, version %s.", self._version)
+        return entry
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+        if self.stamps is not None:
+            self.stamps.set(self.STAMP_KEY, os.urandom(8).hex())
+
+
+irregular_cache = IrregularVerbsCache(ttl=int(os.getenv('IRREGULAR_CACHE_TTL', '3600')), stamps=stamp_cache)
+
+
+#schema migrations
+def _migration_create_tables(connection):
+    SQLModel.metadata.create_all(connection)
+
+def _create_indexes(connection, names):
+    # create_all only creates indexes together with a new table, so existing
+    # databases get new indexes from the migration that adds their columns
+    indexes = {index.name: index for table in SQLModel.metadata.sorted_tables for index in table.indexes}
+    for name in names:
+        indexes[name].create(connection, checkfirst=True)
+
+def _migration_create_indexes(connection):
+    # frozen to the indexes of this migration; later ones cover columns that
+    # do not exist yet on an old database
+    _create_indexes(connection, [
+        "ix_germanwords_user_id_user_word_id", "ix_germanwords_german_word", "ix_germanwords_german_translated_word",
+        "ix_notes_user_id_created_at", "ix_notes_user_id_user_note_id",
+        "ix_schweizwords_user_id_user_word_id", "ix_schweizwords_schweiz_word",
+        "ix_irregularverbs_infinitive",
+    ])
+
+def _add_missing_columns(connection, model, names):
+    existing = {column['name'] for column in inspect(connection).get_columns(model.__tablename__)}
+    for name in names:
+        if name in existing:
+            continue
+        column = model.__table__.c[name]
+        ddl = f"ALTER TABLE {model.__tablename__} ADD COLUMN {name} {column.type.compile(dialect=connection.dialect)}"
+        if column.server_default is not None:
+            ddl += f" NOT NULL DEFAULT {column.server_default.arg}"
+        connection.exec_driver_sql(ddl)
+
+def _migration_review_schedule(connection):
+    for model in (GermanWords, SchweizWords):
+        _add_missing_columns(connection, model, ["ease_factor", "interval_days", "repetitions", "due_at"])
+        connection.execute(
+            update(model).where(model.due_at.is_(None)).values(due_at=datetime.utcnow())
+        )
+    _create_indexes(connection, ["ix_germanwords_user_id_due_at", "ix_schweizwords_user_id_due_at"])
+
+NOTES_FTS_TRIGGERS = {
+    "notes_fts_insert": "AFTER INSERT ON notes BEGIN "
+        "INSERT INTO notes_fts(rowid, title, body, user_id) VALUES (new.id, new.title, new.body, new.user_id); END",
+    "notes_fts_delete": "AFTER DELETE ON notes BEGIN "
+        "INSERT INTO notes_fts(notes_fts, rowid, title, body, user_id) "
+        "VALUES ('delete', old.id, old.title, old.body, old.user_id); END",
+    "notes_fts_update": "AFTER UPDATE ON notes BEGIN "
+        "INSERT INTO notes_fts(notes_fts, rowid, title, body, user_id) "
+        "VALUES ('delete', old.id, old.title, old.body, old.user_id); "
+        "INSERT INTO notes_fts(rowid, title, body, user_id) VALUES (new.id, new.title, new.body, new.user_id); END",
+}
+
+def _migration_notes_fulltext(connection):
+    # SQLite keeps an FTS5 shadow table in sync with triggers, MySQL maintains
+    # its FULLTEXT index itself; other databases fall back to LIKE in search_notes()
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+            "title, body, user_id, content='notes', content_rowid='id', tokenize='unicode61')"
+        )
+        for name, body in NOTES_FTS_TRIGGERS.items():
+            connection.exec_driver_sql(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+        connection.exec_driver_sql("INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')")
+    elif connection.dialect.name in ("mysql", "mariadb"):
+        indexes = {index['name'] for index in inspect(connection).get_indexes("notes")}
+        if "ft_notes_title_body" not in indexes:
+            connection.exec_driver_sql("ALTER TABLE notes ADD FULLTEXT INDEX ft_notes_title_body (title, body)")
+
+def _migration_delta_sync(connection):
+    for model in (GermanWords, SchweizWords, Notes):
+        _add_missing_columns(connection, model, ["sync_version", "updated_at"])
+    connection.execute(update(Notes).where(Notes.updated_at.is_(None)).values(updated_at=Notes.created_at))
+    for model in (GermanWords, SchweizWords):
+        connection.execute(update(model).where(model.updated_at.is_(None)).values(updated_at=datetime.utcnow()))
+    Tombstone.__table__.create(connection, checkfirst=True)
+    _create_indexes(connection, ["ix_germanwords_user_id_sync_version", "ix_notes_user_id_sync_version",
+                                 "ix_schweizwords_user_id_sync_version"])
+
+# (version, description, migrate(connection)); append only, never renumber
+MIGRATIONS = [
+    (1, "create tables", _migration_create_tables),
+    (2, "user_id composite and word search indexes", _migration_create_indexes),
+    (3, "SM-2 review schedule columns and due_at indexes", _migration_review_schedule),
+    (4, "notes full-text index", _migration_notes_fulltext),
+    (5, "delta sync versions and tombstones", _migration_delta_sync),
+]
+
+def run_migrations(bind):
+    with bind.begin() as connection:
+        SchemaMigration.__table__.create(connection, checkfirst=True)
+        applied = set(connection.execute(select(SchemaMigration.version)).scalars())
+
+    for version, description, migrate in MIGRATIONS:
+        if version in applied:
+            continue
+        try:
+            with bind.begin() as connection:
+                migrate(connection)
+                connection.execute(sql_insert(SchemaMigration).values(
+                    version=version, description=description, applied_at=datetime.now(timezone.utc)
+                ))
+            logging.info("Applied schema migration %s: %s", version, description)
+        except IntegrityError:
+            # another worker applied the same migration first
+            logging.info("Schema migration %s already applied.", version)
+
+
 login_manager = LoginManager()
 login_manager.login_view = 'login'
 login_manager.init_app(app)
@@ -102,57 +1303,597 @@ login_manager.init_app(app)
 
 #helper function
 def update_value(route_name, html, table, first_form_word, second_form_word, first_form_word_id, second_form_word_id, third_form_word, third_form_word_id):
-    with Session(engine) as session:
+    with request_session() as session:
         user_id = current_user.id
 
         if request.method == "POST":
-            changes_made = False
+            form_fields = [(first_form_word, first_form_word_id), (second_form_word, second_form_word_id)]
+            if third_form_word is not None and third_form_word_id is not None:
+                form_fields.append((third_form_word, third_form_word_id))
 
+            changes = {}
             for key in request.form:
                 if key.startswith(f"{first_form_word_id}"):
                     word_id = key.split("_")[-1]
-                    new_first_word = request.form.get(f"{first_form_word_id}{word_id}")
-                    new_second_word = request.form.get(f"{second_form_word_id}{word_id}")
-
-                    old_word = session.exec(
-                        select(table).where(table.user_id == user_id, table.id == word_id)
-                    ).first()
-
-                    if old_word:
-                        updated = False
-                        if new_first_word != getattr(old_word, first_form_word):
-                            setattr(old_word, first_form_word, new_first_word)
-                            updated = True
-                        if new_second_word != getattr(old_word, second_form_word):
-                            setattr(old_word, second_form_word, new_second_word)
-                            updated = True
-
-                        if third_form_word is not None and third_form_word_id is not None:
-                            new_third_word = request.form.get(f"{third_form_word_id}{word_id}")
-                            if new_third_word != getattr(old_word, third_form_word):
-                                setattr(old_word, third_form_word, new_third_word)
-                                updated = True
-
-                        if updated:
-                            changes_made = True
-
-            if changes_made:
+                    try:
+                        word_id = int(word_id)
+                    except ValueError:
+                        continue
+                    changes[word_id] = {
+                        column: request.form.get(f"{form_id}{word_id}")
+                        for column, form_id in form_fields
+                    }
+
+            changed_words, _ = apply_word_changes(session, table, user_id, changes)
+
+            if changed_words:
                 session.commit()
+                for word in changed_words:
+                    search_index.refresh(table.__name__, user_id, word)
 
             return redirect(url_for(f"{route_name}"))
 
-        words = session.exec(select(table).where(table.user_id == user_id)).all()
-        return render_template(html, words=words)
+        return stream_page(html, word_page=lazy_word_page(session, table, user_id))
 
-def resequence_user_words(session, table, user_id, word_id_field):
-    words = session.exec(
-        select(table)
-        .where(table.user_id == user_id)
-        .order_by(table.id)
-    ).all()
+def apply_word_changes(session, table, user_id, changes):
+    # changes maps word id -> {column: new value}; the rows come from one IN
+    # query per ID_CHUNK_SIZE ids
+    if not changes:
+        return [], []
 
-    for index, word in enumerate(words, start=1):
-        setattr(word, word_id_field, index)
+    word_ids = list(changes)
+    chunk_size = current_app.config['ID_CHUNK_SIZE']
+    words = []
+    for start in range(0, len(word_ids), chunk_size):
+        words += session.exec(
+            select(table).where(table.user_id == user_id, table.id.in_(word_ids[start:start + chunk_size]))
+        ).all()
+
+    changed_words = []
+    for word in words:
+        updated = False
+        for column, value in changes[word.id].items():
+            if value is not None and value != getattr(word, column):
+                setattr(word, column, value)
+                updated = True
+        if updated:
+            changed_words.append(word)
+    if changed_words:
+        version = bump_data_version(session, user_id, table.__name__)
+        for word in changed_words:
+            word.sync_version = version
+            word.updated_at = datetime.utcnow()
+
+    found = {word.id for word in words}
+    missing = [word_id for word_id in changes if word_id not in found]
+    return changed_words, missing
+
+def fetch_words_page(session, table, user_id, after=None, limit=None):
+    # keyset pagination on user_word_id: every page is an index seek, no OFFSET scan
+    limit = limit or current_app.config['WORDS_PAGE_SIZE']
+    query = select(table).where(table.user_id == user_id)
+    if after is not None:
+        query = query.where(table.user_word_id > after)
+
+    words = session.exec(query.order_by(table.user_word_id).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(words) > limit:
+        words = words[:limit]
+        next_cursor = words[-1].user_word_id
+
+    return words, next_cursor
+
+def allocate_user_ids(session, user_id, name, count=1):
+    # one atomic UPDATE on the user's counter row replaces ORDER BY ... FOR UPDATE,
+    # which SQLite ignores; call it before any other write in the transaction
+    counter = (UserCounter.user_id == user_id, UserCounter.name == name)
+    bump = update(UserCounter).where(*counter).values(value=UserCounter.value + count)
+
+    if session.exec(bump).rowcount == 0:
+        model, column = COUNTER_COLUMNS[name]
+        current = session.exec(
+            select(func.max(getattr(model, column))).where(model.user_id == user_id)
+        ).one() or 0
+        session.add(UserCounter(user_id=user_id, name=name, value=current + count))
+        try:
+            session.flush()
+            return current + 1
+        except IntegrityError:
+            # another worker seeded the counter first
+            session.rollback()
+            session.exec(bump)
+
+    value = session.exec(select(UserCounter.value).where(*counter)).one()
+    return value - count + 1
+
+def fetch_notes_page(session, user_id, cursor=None, limit=None):
+    # newest first, keyset on (created_at, id); bodies are cut to a preview in SQL
+    limit = limit or current_app.config['NOTES_PAGE_SIZE']
+    preview_length = current_app.config['NOTES_PREVIEW_LENGTH']
+
+    query = select(
+        Notes.id, Notes.user_note_id, Notes.title, Notes.created_at,
+        func.substr(Notes.body, 1, preview_length + 1)
+    ).where(Notes.user_id == user_id)
+    if cursor is not None:
+        query = query.where(tuple_(Notes.created_at, Notes.id) < cursor)
+
+    rows = session.exec(query.order_by(Notes.created_at.desc(), Notes.id.desc()).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1].created_at.isoformat()}|{rows[-1].id}"
+
+    notes = [
+        {"id": note_id, "user_note_id": user_note_id, "title": title,
+         "preview": preview[:preview_length], "truncated": len(preview) > preview_length}
+        for note_id, user_note_id, title, created_at, preview in rows
+    ]
+    return notes, next_cursor
+
+def _highlight(text, terms, width=None):
+    # escape first, then mark the terms, so user text can never inject markup
+    if width and len(text) > width:
+        lowered = text.lower()
+        hits = [lowered.find(term) for term in terms if lowered.find(term) >= 0]
+        start = max(min(hits, default=0) - width // 3, 0)
+        text = ("…" if start else "") + text[start:start + width] + ("…" if start + width < len(text) else "")
+    html = str(escape(text))
+    for term in sorted(terms, key=len, reverse=True):
+        html = re.sub(f"({re.escape(str(escape(term)))})", r"<mark>\1</mark>", html, flags=re.IGNORECASE)
+    return Markup(html)
+
+def search_notes(session, user_id, query, page=1, per_page=20):
+    """Ranked full-text search over a user's notes with highlighted snippets."""
+    terms = [term.lower() for term in re.findall(r"\w+", query)]
+    if not terms:
+        return [], False
+
+    dialect = session.get_bind().dialect.name
+    offset = (page - 1) * per_page
+
+    if dialect == "sqlite":
+        # user_id is an indexed FTS column so bm25 only ranks this user's notes;
+        # \x02/\x03 mark the hits so the snippet can be escaped before <mark> goes in
+        match = f'user_id : "{int(user_id)}" AND {{title body}} : (' + " ".join(f'"{term}"*' for term in terms) + ")"
+        rows = session.exec(text(
+            "SELECT notes_fts.rowid, "
+            "highlight(notes_fts, 0, char(2), char(3)), "
+            "snippet(notes_fts, 1, char(2), char(3), '…', 16) "
+            "FROM notes_fts WHERE notes_fts MATCH :match "
+            "ORDER BY bm25(notes_fts, 5.0, 1.0, 0.0) LIMIT :limit OFFSET :offset"
+        ).bindparams(match=match, limit=per_page + 1, offset=offset)).all()
+
+        def marked(value):
+            return Markup(str(escape(value)).replace("\x02", "<mark>").replace("\x03", "</mark>"))
+
+        results = [{"id": note_id, "title_html": marked(title), "snippet_html": marked(snippet)}
+                   for note_id, title, snippet in rows]
+    else:
+        if dialect in ("mysql", "mariadb"):
+            against = " ".join(f"+{term}*" for term in terms)
+            match = "MATCH (title, body) AGAINST (:against IN BOOLEAN MODE)"
+            query_rows = select(Notes.id, Notes.title, Notes.body).where(
+                Notes.user_id == user_id, text(match).bindparams(against=against)
+            ).order_by(text(f"{match} DESC").bindparams(against=against))
+        else:
+            query_rows = select(Notes.id, Notes.title, Notes.body).where(
+                Notes.user_id == user_id,
+                *[(Notes.title.ilike(f"%{term}%")) | (Notes.body.ilike(f"%{term}%")) for term in terms]
+            ).order_by(Notes.created_at.desc())
+        rows = session.exec(query_rows.limit(per_page + 1).offset(offset)).all()
+        results = [{"id": note_id, "title_html": _highlight(title, terms),
+                    "snippet_html": _highlight(body, terms, width=120)}
+                   for note_id, title, body in rows]
+
+    return results[:per_page], len(results) > per_page
+
+def parse_notes_cursor(cursor):
+    created_at, note_id = cursor.rsplit("|", 1)
+    return datetime.fromisoformat(created_at), int(note_id)
+
+# tried in order on uploads; Excel on a German Windows saves CSV as cp1252
+IMPORT_ENCODINGS = ("utf-8-sig", "cp1252")
+
+def detect_upload_encoding(stream):
+    """Return the first of IMPORT_ENCODINGS that decodes the whole upload.
+
+    Raises UnicodeDecodeError when none does. The stream is read in blocks
+    and rewound, so the rows are still parsed lazily afterwards.
+    """
+    for encoding in IMPORT_ENCODINGS:
+        decoder = codecs.getincrementaldecoder(encoding)()
+        stream.seek(0)
+        try:
+            for block in iter(lambda: stream.read(64 * 1024), b""):
+                decoder.decode(block)
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError as error:
+            failure = error
+            continue
+        stream.seek(0)
+        return encoding
+    raise failure
+
+def import_user_words(session, table_name, user_id, stream, filename=""):
+    """Bulk insert words from an uploaded CSV/TSV stream in one transaction.
+
+    Rows are parsed lazily, checked against the model's column lengths and
+    against the user's existing words, then given one contiguous block of
+    user_word_id values and written with executemany in IMPORT_CHUNK_SIZE chunks.
+    """
+    table_info = WORD_TABLES[table_name]
+    model = table_info['model']
+    columns = table_info['columns']
+    max_lengths = [model.__table__.c[column].type.length for column in columns]
+
+    encoding = detect_upload_encoding(stream)
+    text = io.TextIOWrapper(stream, encoding=encoding, newline="")
+    head = [line for line in (text.readline() for _ in range(5)) if line]
+    if filename.lower().endswith(".tsv"):
+        delimiter = "\t"
+    else:
+        # the delimiter that occurs most often in the first lines wins
+        sample = "".join(head)
+        delimiter = max("\t;,", key=sample.count)
+    reader = csv.reader(itertools.chain(head, text), delimiter=delimiter)
+
+    existing = set(session.exec(
+        select(*(getattr(model, column) for column in columns)).where(model.user_id == user_id)
+    ).all())
+
+    rows, duplicates, rejected = [], 0, []
+    for line_number, record in enumerate(reader, start=1):
+        values = tuple(value.strip() for value in record)
+        if not any(values):
+            continue
+        if line_number == 1 and [value.lower() for value in values] == columns:
+            continue
+        if len(values) != len(columns) or not all(values) or any(
+                len(value) > max_length for value, max_length in zip(values, max_lengths)):
+            rejected.append(line_number)
+            continue
+        if values in existing:
+            duplicates += 1
+            continue
+        existing.add(values)
+        rows.append(values)
+
+    if rows:
+        first_id = allocate_user_ids(session, user_id, table_name, count=len(rows))
+        version = bump_data_version(session, user_id, table_name)
+        chunk_size = current_app.config['IMPORT_CHUNK_SIZE']
+        for start in range(0, len(rows), chunk_size):
+            now = datetime.utcnow()
+            session.execute(sql_insert(model), [
+                {"user_id": user_id, "user_word_id": first_id + start + offset, "due_at": now,
+                 "sync_version": version, "updated_at": now, **dict(zip(columns, values))}
+                for offset, values in enumerate(rows[start:start + chunk_size])
+            ])
+
+    return {"inserted": len(rows), "duplicates": duplicates, "rejected": len(rejected),
+            "rejected_lines": rejected[:20], "encoding": encoding}
+
+def schedule_review(ease_factor, interval_days, repetitions, grade):
+    # SM-2: grade 0-5, anything below 3 restarts the card
+    if grade < 3:
+        repetitions, interval_days = 0, 1
+    else:
+        repetitions += 1
+        if repetitions == 1:
+            interval_days = 1
+        elif repetitions == 2:
+            interval_days = 6
+        else:
+            interval_days = round(interval_days * ease_factor)
+    ease_factor = max(1.3, ease_factor + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+
+    return {
+        "ease_factor": ease_factor,
+        "interval_days": interval_days,
+        "repetitions": repetitions,
+        "due_at": datetime.utcnow() + timedelta(days=interval_days),
+    }
+
+def delete_user_rows(session, table, user_id, row_ids):
+    # user_word_id is a stable, gap-tolerant sort key and display numbers are
+    # computed at read time, so a delete is one statement with no renumbering;
+    # the tombstones are copied from the same rows just before. Large
+    # selections run in ID_CHUNK_SIZE pieces within the caller's transaction
+    row_ids = list(row_ids)
+    chunk_size = current_app.config['ID_CHUNK_SIZE']
+    version = bump_data_version(session, user_id, table.__name__)
+    deleted = 0
+    for start in range(0, len(row_ids), chunk_size):
+        owned = (table.user_id == user_id, table.id.in_(row_ids[start:start + chunk_size]))
+        session.exec(sql_insert(Tombstone).from_select(
+            ["user_id", "table_name", "row_id", "sync_version", "deleted_at"],
+            select(table.user_id, literal(table.__name__), table.id, literal(version), literal(datetime.utcnow()))
+            .where(*owned)
+        ))
+        deleted += session.exec(delete(table).where(*owned)).rowcount
+    return deleted, version
+
+def bump_data_version(session, user_id, table_name):
+    # the version row is written in the caller's transaction, so every worker
+    # sees the new version, and stops using its cached fragment, at commit; the
+    # row lock also keeps one user's writes to a table in version order, which
+    # is what lets /sync page by version. Returns the new version for stamping
+    counter = (UserCounter.user_id == user_id, UserCounter.name == f"{table_name}:version")
+    bump = update(UserCounter).where(*counter).values(value=UserCounter.value + 1)
+    if session.exec(bump).rowcount == 0:
+        try:
+            with session.begin_nested():
+                session.add(UserCounter(user_id=user_id, name=f"{table_name}:version", value=1))
+            return 1
+        except IntegrityError:
+            # another worker created the row first
+            session.exec(bump)
+    return session.exec(select(UserCounter.value).where(*counter)).one()
+
+def get_data_version(session, user_id, table_name):
+    return session.exec(select(UserCounter.value).where(
+        UserCounter.user_id == user_id, UserCounter.name == f"{table_name}:version"
+    )).first() or 0
+
+CSRF_PLACEHOLDER = "__csrf_token__"
+
+def render_word_rows(session, table, user_id):
+    # the first page of rows as HTML plus its cursor; CSRF tokens are per
+    # session, so the cached markup holds a placeholder that is filled per request
+    table_name = table.__name__
+    key = (user_id, table_name, get_data_version(session, user_id, table_name))
+    cached = fragment_cache.get(key)
+    if cached is None:
+        words, next_cursor = fetch_words_page(session, table, user_id)
+        rows_html = render_template(WORD_TABLES[table_name]['rows_template'], words=words,
+                                    csrf_token=lambda: CSRF_PLACEHOLDER)
+        cached = (rows_html, next_cursor)
+        fragment_cache.set(key, cached)
+
+    rows_html, next_cursor = cached
+    return Markup(rows_html.replace(CSRF_PLACEHOLDER, generate_csrf())), next_cursor
+
+def lazy_word_page(session, table, user_id):
+    # rendered by the streamed template once the page head has been sent
+    def word_page():
+        try:
+            page = render_word_rows(session, table, user_id)
+            logging.info("First %s page fetched for user: %s", table.__name__, user_id)
+            return page
+        except Exception:
+            session.rollback()
+            logging.exception("Error while fetching %s for user.", table.__name__)
+            return '', None
+    return word_page
+
+def stream_page(template_name, **context):
+    # sends the page in chunks of STREAM_BUFFER_EVENTS template events while it
+    # renders, so the browser gets the head and starts loading assets before
+    # slow parts such as the word rows are done
+    # flashes and the CSRF token live in the session cookie, which is written
+    # before the body, so they are read now and the template sees cached values
+    get_flashed_messages()
+    generate_csrf()
+    template = app.jinja_env.get_template(template_name)
+    app.update_template_context(context)
+    g.metrics_deferred = True
+
+    def generate():
+        # bytes are counted before compress_chunks(), which wraps this generator
+        status, sent = 500, 0
+        try:
+            before_render_template.send(app, _async_wrapper=app.ensure_sync, template=template, context=context)
+            stream = template.stream(context)
+            stream.enable_buffering(app.config['STREAM_BUFFER_EVENTS'])
+            for chunk in stream:
+                chunk = chunk.encode('utf-8')
+                sent += len(chunk)
+                yield chunk
+            template_rendered.send(app, _async_wrapper=app.ensure_sync, template=template, context=context)
+            status = 200
+        finally:
+            record_request_metrics(status, sent)
+
+    return streamed_response(generate(), 'text/html')
+
+def streamed_response(chunks, mimetype):
+    # stream_with_context pushes the request's contexts again while the body is
+    # sent, but their teardown has already run by then, so a session the body
+    # uses would reconnect and never be closed; it is closed with the response
+    g.session_streamed = True
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.call_on_close(get_session().close)
+    return response
+
+# export columns; the word CSV has the layout /dictionary/import reads back, and
+# anki maps each table onto the Front/Back fields of Anki's Basic note type
+EXPORT_TABLES = {
+    'GermanWords': {
+        'csv': WORD_TABLES['GermanWords']['columns'],
+        'ndjson': ['id', *SYNC_TABLES['GermanWords'][1], 'updated_at'],
+        'anki': (['german_word'], ['german_translated_word']),
+    },
+    'SchweizWords': {
+        'csv': WORD_TABLES['SchweizWords']['columns'],
+        'ndjson': ['id', *SYNC_TABLES['SchweizWords'][1], 'updated_at'],
+        'anki': (['schweiz_word'], ['schweiz_translated_german_word', 'schweiz_translated_word']),
+    },
+    'Notes': {
+        'csv': ['title', 'body', 'created_at'],
+        'ndjson': ['id', *SYNC_TABLES['Notes'][1], 'updated_at'],
+        'anki': (['title'], ['body']),
+    },
+}
+
+EXPORT_MIMETYPES = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'anki': ('text/plain', 'txt'),
+}
+
+def iter_export_rows(session, table_name, user_id, columns):
+    # yield_per streams the result: a server-side cursor on MySQL, lazy
+    # fetches on SQLite, so memory stays flat however many rows the user has
+    model = SYNC_TABLES[table_name][0]
+    position = model.user_note_id if table_name == 'Notes' else model.user_word_id
+    query = (select(*(getattr(model, column) for column in columns))
+             .where(model.user_id == user_id)
+             .order_by(position)
+             .execution_options(yield_per=current_app.config['EXPORT_CHUNK_SIZE']))
+    for row in session.exec(query):
+        yield [value.isoformat() if isinstance(value, datetime) else value for value in row]
+
+def stream_export(session, table_name, user_id, export_format):
+    """Yield the export of one table as text chunks of EXPORT_CHUNK_SIZE rows."""
+    chunk_size = current_app.config['EXPORT_CHUNK_SIZE']
+    spec = EXPORT_TABLES[table_name]
+    buffer = io.StringIO()
+
+    if export_format == 'ndjson':
+        columns = spec['ndjson']
+        for count, row in enumerate(iter_export_rows(session, table_name, user_id, columns), start=1):
+            buffer.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+            buffer.write("\n")
+            if count % chunk_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+        return
+
+    if export_format == 'anki':
+        # Anki's text import reads these headers; the guid column lets a
+        # re-import update the existing cards instead of duplicating them
+        front, back = spec['anki']
+        columns = ['id', *front, *back]
+        buffer.write("#separator:Tab\n#html:false\n#notetype:Basic\n"
+                     f"#deck:Golden Gate::{table_name}\n#columns:Front\tBack\tGUID\n#guid column:3\n")
+        writer = csv.writer(buffer, delimiter="\t", lineterminator="\n")
+        rows = ([" / ".join(row[1:1 + len(front)]), " / ".join(row[1 + len(front):]), f"gg-{table_name}-{row[0]}"]
+                for row in iter_export_rows(session, table_name, user_id, columns))
+    else:
+        # the BOM lets Excel detect UTF-8; the importer strips it again
+        buffer.write("\ufeff")
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(spec['csv'])
+        rows = iter_export_rows(session, table_name, user_id, spec['csv'])
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def parse_sync_cursor(cursor):
+    # "" = nothing synced yet, "7" = all of version 7, "7:120" = version 7 up to row 120
+    if not cursor:
+        return -1, None
+    version, _, row_id = cursor.partition(":")
+    return int(version), int(row_id) if row_id else None
+
+def fetch_sync_delta(session, table_name, user_id, cursor, limit):
+    """Rows of one table written after cursor and the ids deleted since then.
+
+    Pages follow (sync_version, id), so one large import can span several pages.
+    Deletes are sent up to the version of the last row in the page; clients apply
+    them before the upserts. A cursor older than the pruned tombstones (or newer
+    than the server) comes back with reset=True and the full table.
+    """
+    model, columns = SYNC_TABLES[table_name]
+    current = get_data_version(session, user_id, table_name)
+    pruned = session.exec(select(UserCounter.value).where(
+        UserCounter.user_id == user_id, UserCounter.name == f"{table_name}:pruned"
+    )).first() or 0
+
+    version, row_id = cursor
+    reset = version > current or 0 <= version < pruned
+    if reset:
+        version, row_id = -1, None
+
+    query = select(model.id, model.sync_version, model.updated_at, *(getattr(model, column) for column in columns)).where(
+        model.user_id == user_id, model.sync_version <= current)
+    if row_id is None:
+        query = query.where(model.sync_version > version)
+    else:
+        query = query.where(tuple_(model.sync_version, model.id) > (version, row_id))
+    rows = session.exec(query.order_by(model.sync_version, model.id).limit(limit + 1)).all()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if more:
+        upper, next_cursor = rows[-1].sync_version, f"{rows[-1].sync_version}:{rows[-1].id}"
+    else:
+        upper, next_cursor = current, str(current)
+
+    deletes = []
+    if version >= 0:
+        deletes = session.exec(select(Tombstone.row_id).where(
+            Tombstone.user_id == user_id, Tombstone.table_name == table_name,
+            Tombstone.sync_version > version, Tombstone.sync_version <= upper
+        )).all()
+
+    upserts = []
+    for row in rows:
+        item = {"id": row.id, "sync_version": row.sync_version,
+                "updated_at": row.updated_at.isoformat() if row.updated_at else None}
+        for column in columns:
+            value = getattr(row, column)
+            item[column] = value.isoformat() if isinstance(value, datetime) else value
+        upserts.append(item)
+
+    return {"upserts": upserts, "deletes": list(deletes), "cursor": next_cursor, "more": more, "reset": reset}
+
+
+
+#static assets
+# built by `flask --app app build-assets` into static/dist; templates link them
+# through asset_url(), which falls back to the raw file when there is no build
+ASSET_DIR = os.path.join(app.static_folder, 'dist')
+ASSET_MANIFEST = os.path.join(ASSET_DIR, 'manifest.json')
+ASSET_COMPRESSIBLE = ('.js', '.css', '.svg', '.json', '.txt', '.html')
+_asset_manifest = {'mtime': None, 'files': {}}
+
+
+def load_asset_manifest():
+    try:
+        mtime = os.path.getmtime(ASSET_MANIFEST)
+    except OSError:
+        return {}
+    if mtime != _asset_manifest['mtime']:
+        with open(ASSET_MANIFEST, encoding="utf-8") as handle:
+            _asset_manifest['files'] = json.load(handle)
+        _asset_manifest['mtime'] = mtime
+    return _asset_manifest['files']
+
+
+@app.template_global()
+def asset_url(filename):
+    hashed = load_asset_manifest().get(filename)
+    if hashed is None:
+        return url_for('static', filename=filename)
+    return url_for('assets', filename=hashed)
+
+
+@app.route('/assets/<path:filename>')
+def assets(filename):
+    mimetype = mimetypes.guess_type(filename)[0]
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(ASSET_DIR, filename + suffix)):
+            response = send_from_directory(ASSET_DIR, filename + suffix, mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_from_directory(ASSET_DIR, filename, mimetype=mimetype)
+
+    # the file name changes with its content, so it can be cached forever
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 
 
@@ -168,12 +1909,29 @@ def login():
         username = form.username.data
         password = form.password.data
 
-        with Session(engine) as session:
+        retry_after = auth_throttled(username)
+        if retry_after:
+            logging.warning("Login throttled for user: %s", username)
+            return auth_refused("login.html", form, 'Zu viele Anmeldeversuche — bitte warte kurz.', 429, retry_after)
+
+        with request_session() as session:
             user = session.exec(select(User).where(User.username == username)).first()
 
             if user:
-                if check_password_hash(user.password, password):
+                try:
+                    valid = password_hasher.verify(user.password, password)
+                    if valid and password_hasher.needs_rehash(user.password):
+                        user.password = password_hasher.hash(password)
+                        session.commit()
+                        logging.info("Password hash upgraded for user: %s", username)
+                except HasherBusy:
+                    logging.warning("Password hasher busy, login refused for: %s", username)
+                    return auth_refused("login.html", form, 'Server ausgelastet — bitte versuche es gleich noch einmal.', 503, 1)
+
+                if valid:
                     login_user(user, remember=form.remember.data)
+                    session.expunge(user)
+                    user_cache.set(user.id, user)
                     logging.info("User logged in: %s", username)
                     return redirect(url_for("insert"))
                 else:
@@ -193,14 +1951,23 @@ def register():
         username = form.username.data.strip()
         password = form.password.data
 
-        with Session(engine) as session:
+        retry_after = auth_throttled()
+        if retry_after:
+            logging.warning("Registration throttled for: %s", request.remote_addr)
+            return auth_refused("register.html", form, 'Zu viele Versuche — bitte warte kurz.', 429, retry_after)
+
+        with request_session() as session:
             existing = session.exec(select(User).where(User.username == username)).first()
             if existing:
                 logging.warning("Attempt to register existing username: %s", username)
                 flash('Benutzername bereits vergeben', 'error')
                 return render_template('register.html', form=form)
 
-            hashed_pw = generate_password_hash(password)
+            try:
+                hashed_pw = password_hasher.hash(password)
+            except HasherBusy:
+                logging.warning("Password hasher busy, registration refused for: %s", username)
+                return auth_refused("register.html", form, 'Server ausgelastet — bitte versuche es gleich noch einmal.', 503, 1)
             new_user = User(username=username, password=hashed_pw)
             session.add(new_user)
             session.commit()
@@ -215,6 +1982,7 @@ def register():
 @app.route("/logout")
 @login_required
 def logout():
+    invalidate_cached_user(current_user.id)
     logout_user()
     session.clear()
     remember_cookie_name = current_app.config.get('REMEMBER_COOKIE_NAME', 'remember_token')
@@ -225,8 +1993,19 @@ def logout():
 
 @login_manager.user_loader
 def load_user(user_id):
-    with Session(engine) as session:
-        return session.get(User, int(user_id))
+    user_id = int(user_id)
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    with request_session() as session:
+        user = session.get(User, user_id)
+        if user is not None:
+            # cached across requests, so detach it from this request's session
+            session.expunge(user)
+    if user is not None:
+        user_cache.set(user_id, user)
+    return user
 
 
 
@@ -234,7 +2013,7 @@ def load_user(user_id):
 @app.route("/insert", methods=["GET", "POST"])
 @login_required
 def insert():
-    with Session(engine) as session:
+    with request_session() as session:
         if request.method == "POST":
             german_word = request.form.get('german_word', '').strip()
             german_translated_word = request.form.get('german_translated_word', '').strip()
@@ -244,27 +2023,21 @@ def insert():
                 return redirect(url_for("insert"))
 
             try:
-                last_word = session.exec(
-                    select(GermanWords)
-                    .where(GermanWords.user_id == current_user.id)
-                    .order_by(GermanWords.user_word_id.desc())
-                    .with_for_update()
-                ).first()
-                logging.debug(f"Last user word fetched successfully: {last_word}")
-
-                user_word_id = (last_word.user_word_id + 1) if last_word else 1
-                logging.info(f"Last user word id determined: {user_word_id}")
+                user_word_id = allocate_user_ids(session, current_user.id, 'GermanWords')
+                logging.debug("User word id allocated: %s", user_word_id)
 
 
                 new_word = GermanWords(
                     user_word_id=user_word_id,
                     user_id=current_user.id,
                     german_word=german_word,
-                    german_translated_word=german_translated_word
+                    german_translated_word=german_translated_word,
+                    sync_version=bump_data_version(session, current_user.id, 'GermanWords')
                 )
                 session.add(new_word)
                 session.commit()
-                logging.info(f"New word added: {german_word}")
+                search_index.refresh('GermanWords', current_user.id, new_word)
+                logging.info("New word added: %s", german_word)
                 flash('Wort erfolgreich hinzugefügt!')
                 return redirect(url_for("insert"))
 
@@ -273,25 +2046,13 @@ def insert():
                 logging.exception("Error while adding new word.")
                 return redirect(url_for("insert"))
 
-        try:
-            words = session.exec(
-                select(GermanWords)
-                .where(GermanWords.user_id == current_user.id)
-                .order_by(GermanWords.user_word_id)
-            ).all()
-            logging.info(f"All words fetched for user: {current_user.id}")
-
-        except Exception:
-            logging.exception("Error while fetching words for user.")
-            words = []
-
-        return render_template("insert.html", words=words)
+        return stream_page("insert.html", word_page=lazy_word_page(session, GermanWords, current_user.id))
 
 @app.route("/delete_word_insert", methods=["POST"])
 @login_required
 def delete_word_insert():
     word_id = request.form.get("word_id")
-    logging.debug(f"Deleting word with id: {word_id}")
+    logging.debug("Deleting word with id: %s", word_id)
 
     if not word_id:
         logging.warning("No word_id received.")
@@ -305,18 +2066,16 @@ def delete_word_insert():
         flash('Ungültige ID!', 'error')
         return redirect(url_for("insert"))
 
-    with Session(engine) as session:
-        word = session.get(GermanWords, int(word_id))
-        logging.debug(f"Word found: {word}")
+    with request_session() as session:
+        deleted, version = delete_user_rows(session, GermanWords, current_user.id, [word_id])
 
-        if word and word.user_id == current_user.id:
-            session.delete(word)
+        if deleted:
             session.commit()
-            logging.info("Word deleted, resequencing...")
-            resequence_user_words(session, GermanWords, current_user.id, "user_word_id")
-            logging.info("Resequencing done.")
+            search_index.discard('GermanWords', current_user.id, [word_id], version)
+            logging.info("Word deleted.")
             flash('Wort geloscht!', 'success')
         else:
+            session.rollback()
             logging.warning("Word not found or does not belong to user.")
             flash('Das Wort wurde nicht gefunden!', 'error')
 
@@ -357,24 +2116,11 @@ def update_word():
         logging.warning("Invalid word_id format for update_word.")
         return jsonify({"error": "Invalid word ID"}), 400
 
-    allowed_tables = {
-        'GermanWords': {
-            'model': GermanWords,
-            'columns': ["german_word", "german_translated_word"],
-            'user_id': 'user_id'
-        },
-        'SchweizWords': {
-            'model': SchweizWords,
-            'columns': ["schweiz_word", "schweiz_translated_german_word", "schweiz_translated_word"],
-            'user_id': 'user_id'
-        },
-    }
-
-    if table_name not in allowed_tables:
+    if table_name not in WORD_TABLES:
         logging.warning("Invalid table name for update_word.")
         return jsonify({"error": "Invalid table"}), 400
 
-    table_info = allowed_tables[table_name]
+    table_info = WORD_TABLES[table_name]
 
     if column not in table_info['columns']:
         logging.warning("Invalid column name for update_word.")
@@ -382,7 +2128,7 @@ def update_word():
 
 
     try:
-        with Session(engine) as session:
+        with request_session() as session:
             model = table_info['model']
             user_id = table_info['user_id']
 
@@ -391,12 +2137,12 @@ def update_word():
                     select(model)
                     .where(model.id == word_id, getattr(model, user_id) == current_user.id)
                 ).first()
-                logging.debug(f"Fetched word for update: {word}")
+                logging.debug("Fetched word for update: %s", word)
             else:
                 word = session.exec(
                     select(model).where(model.id == word_id)
                 ).first()
-                logging.debug(f"Fetched word for update (no user_id): {word}")
+                logging.debug("Fetched word for update (no user_id): %s", word)
 
             if not word:
                 logging.warning("Word not found for update.")
@@ -405,9 +2151,13 @@ def update_word():
 
             setattr(word, column, value)
 
+            if table_name in WORD_TABLES:
+                word.sync_version = bump_data_version(session, current_user.id, table_name)
+                word.updated_at = datetime.utcnow()
             session.add(word)
             session.commit()
-            logging.info(f"Word updated successfully: {word}")
+            search_index.refresh(table_name, current_user.id, word)
+            logging.info("Word updated successfully: %s", word)
         return jsonify({"status": "ok", "message": "Änderung gespeichert.", "category": "success", "reload": False}), 200
 
     except Exception as e:
@@ -416,19 +2166,242 @@ def update_word():
 
 
 
+@app.route("/dictionary/update/batch", methods=["POST"])
+@login_required
+def update_words_batch():
+    data = request.get_json(silent=True) or {}
+    table_name = data.get("table", "GermanWords")
+    raw_changes = data.get("changes")
+
+    if table_name not in WORD_TABLES:
+        logging.warning("Invalid table name for update_words_batch.")
+        return jsonify({"error": "Invalid table"}), 400
+
+    if not isinstance(raw_changes, list) or not raw_changes:
+        logging.warning("Missing changes for update_words_batch.")
+        return jsonify({"error": "Missing parameters"}), 400
+
+    table_info = WORD_TABLES[table_name]
+    model = table_info['model']
+
+    changes = {}
+    for change in raw_changes:
+        try:
+            word_id = int(change.get("id"))
+            column = change.get("column")
+            value = change.get("value", "")
+        except (AttributeError, ValueError, TypeError):
+            logging.warning("Invalid change format for update_words_batch.")
+            return jsonify({"error": "Invalid word ID"}), 400
+
+        if not isinstance(value, str):
+            logging.warning("Non-string value for update_words_batch.")
+            return jsonify({"error": "Invalid value"}), 400
+        value = value.strip()
+
+        if column not in table_info['columns']:
+            logging.warning("Invalid column name for update_words_batch.")
+            return jsonify({"error": "Invalid column for table"}), 400
+
+        if not value or len(value) > model.__table__.c[column].type.length:
+            logging.warning("Invalid value for update_words_batch.")
+            return jsonify({"error": "Invalid value"}), 400
+
+        # later edits of the same cell win
+        changes.setdefault(word_id, {})[column] = value
+
+    try:
+        with request_session() as session:
+            changed_words, missing = apply_word_changes(session, model, current_user.id, changes)
+            if changed_words:
+                session.commit()
+    except Exception:
+        logging.exception("Error while batch updating words.")
+        return jsonify({"error": "Database error"}), 500
+
+    for word in changed_words:
+        search_index.refresh(table_name, current_user.id, word)
+    logging.info("%s words updated for user: %s", len(changed_words), current_user.id)
+
+    return jsonify({"status": "ok", "updated": len(changed_words), "missing": missing,
+                    "message": "Änderungen gespeichert.", "category": "success", "reload": False}), 200
+
+
+
+@app.route("/dictionary/page", methods=["GET"])
+@login_required
+def words_page():
+    table_name = request.args.get("table", "GermanWords")
+    after = request.args.get("after")
+    offset = request.args.get("offset", "0")
+
+    if table_name not in WORD_TABLES:
+        logging.warning("Invalid table name for words_page.")
+        return jsonify({"error": "Invalid table"}), 400
+
+    try:
+        after = int(after) if after else None
+        offset = int(offset)
+    except ValueError:
+        logging.warning("Invalid cursor format for words_page.")
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    table_info = WORD_TABLES[table_name]
+    model = table_info['model']
+
+    try:
+        with request_session() as session:
+            words, next_cursor = fetch_words_page(session, model, current_user.id, after=after)
+            payload = [
+                {"id": word.id, "ordinal": offset + index,
+                 **{column: getattr(word, column) for column in table_info['columns']}}
+                for index, word in enumerate(words, start=1)
+            ]
+    except Exception:
+        logging.exception("Error while fetching words page.")
+        return jsonify({"error": "Database error"}), 500
+
+    return jsonify({"words": payload, "next_cursor": next_cursor}), 200
+
+
+
+@app.route("/dictionary/search", methods=["GET"])
+@login_required
+def search_words():
+    table_name = request.args.get("table", "GermanWords")
+    query = request.args.get("q", "")
+
+    if table_name not in SEARCH_TABLES:
+        logging.warning("Invalid table name for search_words.")
+        return jsonify({"error": "Invalid table"}), 400
+
+    try:
+        limit = min(int(request.args.get("limit", 50)), 200)
+    except ValueError:
+        logging.warning("Invalid limit format for search_words.")
+        return jsonify({"error": "Invalid limit"}), 400
+
+    table_info = SEARCH_TABLES[table_name]
+    user_id = current_user.id if table_info['user_id'] else None
+
+    try:
+        if user_id:
+            with request_session() as session:
+                version = get_data_version(session, user_id, table_name)
+        else:
+            # the verbs reload, and get a new version, when another process changed them
+            version = irregular_cache.get()['version']
+        hits = search_index.search(table_name, user_id, query, limit=limit, version=version)
+    except Exception:
+        logging.exception("Error while searching words.")
+        return jsonify({"error": "Database error"}), 500
+
+    words = [
+        {"id": row_id, "ordinal": ordinal, **dict(zip(table_info['columns'], values))}
+        for ordinal, row_id, values in hits
+    ]
+    return jsonify({"words": words}), 200
+
+
+
+@app.route("/dictionary/delete", methods=["POST"])
+@login_required
+def delete_words():
+    data = request.get_json(silent=True) or {}
+    table_name = data.get("table", "GermanWords")
+    word_ids = data.get("ids")
+
+    if table_name not in WORD_TABLES:
+        logging.warning("Invalid table name for delete_words.")
+        return jsonify({"error": "Invalid table"}), 400
+
+    if not isinstance(word_ids, list) or not word_ids:
+        logging.warning("Missing ids for delete_words.")
+        return jsonify({"error": "Missing parameters"}), 400
+
+    try:
+        word_ids = {int(word_id) for word_id in word_ids}
+    except (ValueError, TypeError):
+        logging.warning("Invalid word_id format for delete_words.")
+        return jsonify({"error": "Invalid word ID"}), 400
+
+    try:
+        with request_session() as session:
+            deleted, version = delete_user_rows(session, WORD_TABLES[table_name]['model'], current_user.id, word_ids)
+            if deleted:
+                session.commit()
+            else:
+                session.rollback()
+    except Exception:
+        logging.exception("Error while deleting words.")
+        return jsonify({"error": "Database error"}), 500
+
+    if deleted:
+        search_index.discard(table_name, current_user.id, word_ids, version)
+    logging.info("%s words deleted for user: %s", deleted, current_user.id)
+
+    return jsonify({"status": "ok", "deleted": deleted, "message": "Wörter gelöscht.", "category": "success", "reload": True}), 200
+
+
+
+@app.route("/dictionary/import", methods=["POST"])
+@login_required
+def import_words():
+    table_name = request.form.get("table", "GermanWords")
+    upload = request.files.get("file")
+
+    if table_name not in WORD_TABLES:
+        logging.warning("Invalid table name for import_words.")
+        return jsonify({"error": "Invalid table"}), 400
+
+    if not upload or not upload.filename:
+        logging.warning("No file received for import_words.")
+        return jsonify({"error": "Keine Datei!"}), 400
+
+    try:
+        with request_session() as session:
+            result = import_user_words(session, table_name, current_user.id, upload.stream, upload.filename)
+            session.commit()
+    except UnicodeDecodeError:
+        logging.warning("Upload for import_words is neither UTF-8 nor cp1252.")
+        return jsonify({"error": "Die Datei muss UTF-8 oder Windows-1252 (ANSI) kodiert sein."}), 400
+    except Exception:
+        logging.exception("Error while importing words.")
+        return jsonify({"error": "Datenbankfehler"}), 500
+
+    logging.info("Words imported for user %s: %s", current_user.id, result)
+
+    return jsonify({"status": "ok", **result,
+                    "message": f"{result['inserted']} Wörter importiert.", "category": "success", "reload": True}), 200
+
+
+
 #irregular verbs view
 @app.route("/irregular", methods=["GET", "POST"])
 @login_required
 def irregular():
     try:
-        with Session(engine) as session:
-            verbs = session.exec(select(irregularVerbs)).all()
-            logging.info("Irregular verbs fetched successfully.")
+        entry = irregular_cache.get()
     except Exception:
         logging.exception("Error while fetching irregular verbs.")
-        verbs = []
+        return render_template('irregular.html', verb_rows='')
+
+    # the page carries the user's navigation, so the tag is per user as well as per content
+    etag = f"{entry['digest']}-{current_user.id}"
+    has_flashes = bool(session.get('_flashes'))
+
+    if request.method == "GET" and not has_flashes and (request.if_none_match.contains_weak(etag) or (
+            not request.if_none_match and request.if_modified_since
+            and request.if_modified_since >= entry['last_modified'])):
+        response = make_response('', 304)
+    else:
+        response = make_response(render_template('irregular.html', verb_rows=entry['rows_html']))
 
-    return render_template('irregular.html', verbs=verbs)
+    response.set_etag(etag)
+    response.last_modified = entry['last_modified']
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 
 
@@ -436,7 +2409,7 @@ def irregular():
 @app.route("/notes", methods=["GET", "POST"])
 @login_required
 def notes():
-    with Session(engine) as session:
+    with request_session() as session:
 
         if request.method == "POST":
 
@@ -450,26 +2423,20 @@ def notes():
                 return jsonify({"error": "Bitte gib Titel und Inhalt ein."}), 400
 
             try:
-                last_note_id = session.exec(
-                    select(func.max(Notes.user_note_id))
-                    .where(Notes.user_id == current_user.id)
-                    .with_for_update()
-                ).first()
-                logging.debug(f"Last user note fetched successfully: {last_note_id}")
-
-                last_note_id = (last_note_id or 0) + 1
-                logging.info(f"Last user note id determined: {last_note_id}")
+                last_note_id = allocate_user_ids(session, current_user.id, 'Notes')
+                logging.debug("User note id allocated: %s", last_note_id)
 
                 new_note = Notes(
                     user_id=current_user.id,
                     user_note_id=last_note_id,
                     title=title,
-                    body=body
+                    body=body,
+                    sync_version=bump_data_version(session, current_user.id, 'Notes')
                 )
-                logging.info(f"New note created: {title}")
+                logging.info("New note created: %s", title)
                 session.add(new_note)
                 session.commit()
-                logging.info(f"New note added to database: {title}")
+                logging.info("New note added to database: %s", title)
 
                 return jsonify({
                     "success": True,
@@ -490,13 +2457,66 @@ def notes():
                 return jsonify({"error": "Datenbankfehler"}), 500
 
 
-        notes = session.exec(
-            select(Notes)
-            .where(Notes.user_id == current_user.id)
-            .order_by(Notes.created_at.desc())
-        ).all()
+        notes, next_cursor = fetch_notes_page(session, current_user.id)
+
+        return render_template("notes.html", notes=notes, next_cursor=next_cursor)
+
+@app.route("/notes/page", methods=["GET"])
+@login_required
+def notes_page():
+    cursor = request.args.get("cursor")
+
+    try:
+        cursor = parse_notes_cursor(cursor) if cursor else None
+    except ValueError:
+        logging.warning("Invalid cursor format for notes_page.")
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    try:
+        with request_session() as session:
+            notes, next_cursor = fetch_notes_page(session, current_user.id, cursor=cursor)
+    except Exception:
+        logging.exception("Error while fetching notes page.")
+        return jsonify({"error": "Datenbankfehler"}), 500
+
+    return jsonify({"notes": notes, "next_cursor": next_cursor}), 200
+
+@app.route("/notes/search", methods=["GET"])
+@login_required
+def notes_search():
+    query = request.args.get("q", "")
+
+    try:
+        page = max(int(request.args.get("page", 1)), 1)
+    except ValueError:
+        logging.warning("Invalid page format for notes_search.")
+        return jsonify({"error": "Invalid page"}), 400
+
+    try:
+        with request_session() as session:
+            results, has_more = search_notes(session, current_user.id, query, page=page)
+    except Exception:
+        logging.exception("Error while searching notes.")
+        return jsonify({"error": "Datenbankfehler"}), 500
+
+    notes = [{"id": note["id"], "title_html": str(note["title_html"]), "snippet_html": str(note["snippet_html"])}
+             for note in results]
+    return jsonify({"notes": notes, "page": page, "has_more": has_more}), 200
 
-        return render_template("notes.html", notes=notes)
+@app.route("/notes/<int:note_id>", methods=["GET"])
+@login_required
+def note_detail(note_id):
+    with request_session() as session:
+        note = session.exec(
+            select(Notes).where(Notes.id == note_id, Notes.user_id == current_user.id)
+        ).first()
+
+    if not note:
+        logging.warning("Note not found for note_detail.")
+        return jsonify({"error": "Note not found"}), 404
+
+    return jsonify({"note": {"id": note.id, "user_note_id": note.user_note_id,
+                             "title": note.title, "body": note.body}}), 200
 
 @app.route("/notes/edit", methods=["POST"])
 @login_required
@@ -519,12 +2539,12 @@ def edit_note():
         return jsonify({"error": "Missing fields"}), 400
 
     try:
-        with Session(engine) as session:
+        with request_session() as session:
             note = session.exec(
                 select(Notes)
                 .where(Notes.id == note_id, Notes.user_id == current_user.id)
             ).first()
-            logging.debug(f"Fetched note for edit: {note}")
+            logging.debug("Fetched note for edit: %s", note)
 
             if not note:
                 logging.warning("Note not found for edit_note.")
@@ -532,10 +2552,12 @@ def edit_note():
 
             note.title = title
             note.body = body
+            note.sync_version = bump_data_version(session, current_user.id, 'Notes')
+            note.updated_at = datetime.utcnow()
 
             session.add(note)
             session.commit()
-            logging.info(f"Note updated successfully: {note}")
+            logging.info("Note updated successfully: %s", note)
 
             # return updated note to the client so UI can update without full reload
             return jsonify({"status": "ok", "message": "Notiz aktualisiert.", "category": "success", "reload": False,
@@ -555,14 +2577,13 @@ def delete_note():
         logging.warning("Invalid note_id format for delete_note.")
         return redirect(url_for("notes"))
 
-    with Session(engine) as session:
-        note_to_delete = session.get(Notes, note_id)
-        logging.debug(f"Deleting note with id: {note_id}")
-        if note_to_delete and note_to_delete.user_id == current_user.id:
-            session.delete(note_to_delete)
+    with request_session() as session:
+        logging.debug("Deleting note with id: %s", note_id)
+        if delete_user_rows(session, Notes, current_user.id, [note_id])[0]:
             session.commit()
             logging.info("Note deleted successfully.")
         else:
+            session.rollback()
             logging.warning("Note not found or does not belong to user.")
     return redirect(url_for("notes"))
 
@@ -572,15 +2593,8 @@ def delete_note():
 @app.route("/schweiz")
 @login_required
 def schweiz():
-    words = []
-    try:
-        with Session(engine) as session:
-            words = session.exec(select(SchweizWords).where(SchweizWords.user_id == current_user.id)).all()
-            logging.info("Schweiz words fetched successfully.")
-    except Exception:
-        logging.exception("Error while fetching Schweiz words.")
-        return render_template('schweiz.html', words=words)
-    return render_template('schweiz.html', words=words)
+    with request_session() as session:
+        return stream_page('schweiz.html', word_page=lazy_word_page(session, SchweizWords, current_user.id))
 
 @app.route("/schweiz/insert", methods= ["GET", "POST"])
 @login_required
@@ -594,26 +2608,24 @@ def schweiz_insert():
             logging.warning("Missing form fields for schweiz_insert.")
             return render_template('schweiz.html')
 
-        with Session(engine) as session:
+        with request_session() as session:
             try:
-                last_word = session.exec(select(SchweizWords).where(SchweizWords.user_id == current_user.id).order_by(SchweizWords.user_word_id.desc()).with_for_update()).first()
-                logging.debug(f"Last Schweiz user word fetched successfully: {last_word}")
+                last_id = allocate_user_ids(session, current_user.id, 'SchweizWords')
+                logging.debug("Schweiz user word id allocated: %s", last_id)
             except Exception:
-                logging.exception("Error while fetching last Schweiz user word.")
+                session.rollback()
+                logging.exception("Error while allocating Schweiz user word id.")
                 return render_template('schweiz.html')
 
-            if last_word:
-                last_id = last_word.user_word_id +1
-            else:
-                last_id = 1
-            logging.info(f"Last Schweiz user word id: {last_id}")
-            new_word = SchweizWords(user_id=current_user.id, user_word_id=last_id, schweiz_word=schweiz_word, schweiz_translated_german_word=schweiz_translated_german_word, schweiz_translated_word=schweiz_translated_word, )
-            logging.info(f"New Schweiz word created: {schweiz_word}")
+            version = bump_data_version(session, current_user.id, 'SchweizWords')
+            new_word = SchweizWords(user_id=current_user.id, user_word_id=last_id, schweiz_word=schweiz_word, schweiz_translated_german_word=schweiz_translated_german_word, schweiz_translated_word=schweiz_translated_word, sync_version=version)
+            logging.info("New Schweiz word created: %s", schweiz_word)
 
             session.add(new_word)
             session.commit()
+            search_index.refresh('SchweizWords', current_user.id, new_word)
             flash('Wort erfolgreich hinzugefügt!')
-            logging.info(f"New Schweiz word added to database: {schweiz_word}")
+            logging.info("New Schweiz word added to database: %s", schweiz_word)
             return redirect(url_for("schweiz"))
 
     return render_template('schweiz.html')
@@ -624,24 +2636,21 @@ def delete_word_schweiz():
     word_id = request.form.get("word_id")
     try:
         word_id = int(request.form.get("word_id"))
-        logging.debug(f"Deleting Schweiz word with id: {word_id}")
+        logging.debug("Deleting Schweiz word with id: %s", word_id)
     except (ValueError, TypeError):
         logging.warning("Invalid word_id format for delete_word_schweiz.")
         return redirect(url_for("schweiz"))
 
-    with Session(engine) as session:
-        word = session.get(SchweizWords, int(word_id))
-        logging.debug(f"Schweiz Word found: {word}")
+    with request_session() as session:
+        deleted, version = delete_user_rows(session, SchweizWords, current_user.id, [word_id])
 
-        if word and word.user_id == current_user.id:
-            session.delete(word)
+        if deleted:
             session.commit()
-            logging.info("Schweiz Word deleted, resequencing...")
-            resequence_user_words(session, SchweizWords, current_user.id, "user_word_id")
-            session.commit()
-            logging.info("Resequencing done.")
+            search_index.discard('SchweizWords', current_user.id, [word_id], version)
+            logging.info("Schweiz Word deleted.")
             flash('Wort geloscht!', 'success')
         else:
+            session.rollback()
             logging.warning("Schweiz Word not found or does not belong to user.")
             flash('Das Wort wurde nicht gefunden!', 'error')
 
@@ -663,10 +2672,377 @@ def schweiz_dictionary():
         )
 
 
+#export views
+@app.route("/export", methods=["GET"])
+@login_required
+def export():
+    table_name = request.args.get("table", "GermanWords")
+    export_format = request.args.get("format", "csv")
+
+    if table_name not in EXPORT_TABLES or export_format not in EXPORT_MIMETYPES:
+        logging.warning("Invalid table or format for export.")
+        return jsonify({"error": "Invalid table or format"}), 400
+
+    mimetype, extension = EXPORT_MIMETYPES[export_format]
+    logging.info("Export of %s as %s for user: %s", table_name, export_format, current_user.id)
+
+    chunks = stream_export(get_session(), table_name, current_user.id, export_format)
+    response = streamed_response((chunk.encode("utf-8") for chunk in chunks), mimetype)
+    filename = f"{table_name}-{datetime.utcnow():%Y-%m-%d}.{extension}"
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+#sync views
+@app.route("/sync", methods=["GET"])
+@login_required
+def sync():
+    # one cursor per table as a query parameter, e.g. ?GermanWords=12&Notes=3:40
+    try:
+        cursors = {table_name: parse_sync_cursor(request.args.get(table_name, ""))
+                   for table_name in SYNC_TABLES}
+        limit = min(int(request.args.get("limit", app.config['SYNC_PAGE_SIZE'])), 2000)
+    except ValueError:
+        logging.warning("Invalid cursor format for sync.")
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    with request_session() as session:
+        tables = {table_name: fetch_sync_delta(session, table_name, current_user.id, cursor, max(limit, 1))
+                  for table_name, cursor in cursors.items()}
+
+    response = jsonify({"tables": tables})
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route("/sw.js")
+def service_worker():
+    # served from the root so the worker's scope covers every page
+    response = send_from_directory(app.static_folder, 'sw.js', mimetype='text/javascript')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+#review views
+@app.route("/review")
+@login_required
+def review():
+    return render_template('review.html')
+
+@app.route("/review/due", methods=["GET"])
+@login_required
+def review_due():
+    table_name = request.args.get("table", "GermanWords")
+
+    if table_name not in WORD_TABLES:
+        logging.warning("Invalid table name for review_due.")
+        return jsonify({"error": "Invalid table"}), 400
+
+    try:
+        limit = min(int(request.args.get("limit", 20)), 100)
+    except ValueError:
+        logging.warning("Invalid limit format for review_due.")
+        return jsonify({"error": "Invalid limit"}), 400
+
+    table_info = WORD_TABLES[table_name]
+    model = table_info['model']
+
+    try:
+        with request_session() as session:
+            # range read on (user_id, due_at), never a scan of the whole vocabulary
+            words = session.exec(
+                select(model)
+                .where(model.user_id == current_user.id, model.due_at <= datetime.utcnow())
+                .order_by(model.due_at)
+                .limit(limit)
+            ).all()
+    except Exception:
+        logging.exception("Error while fetching due cards.")
+        return jsonify({"error": "Database error"}), 500
+
+    cards = [
+        {"id": word.id, "front": getattr(word, table_info['columns'][0]),
+         "back": [getattr(word, column) for column in table_info['columns'][1:]]}
+        for word in words
+    ]
+    return jsonify({"cards": cards}), 200
+
+@app.route("/review/grade", methods=["POST"])
+@login_required
+def review_grade():
+    data = request.get_json(silent=True) or {}
+    table_name = data.get("table", "GermanWords")
+
+    if table_name not in WORD_TABLES:
+        logging.warning("Invalid table name for review_grade.")
+        return jsonify({"error": "Invalid table"}), 400
+
+    try:
+        word_id = int(data.get("id"))
+        grade = int(data.get("grade"))
+    except (ValueError, TypeError):
+        logging.warning("Invalid parameters for review_grade.")
+        return jsonify({"error": "Invalid parameters"}), 400
+
+    if not 0 <= grade <= 5:
+        logging.warning("Grade out of range for review_grade.")
+        return jsonify({"error": "Invalid grade"}), 400
+
+    model = WORD_TABLES[table_name]['model']
+    owned = (model.id == word_id, model.user_id == current_user.id)
+
+    try:
+        with request_session() as session:
+            current = session.exec(
+                select(model.ease_factor, model.interval_days, model.repetitions).where(*owned)
+            ).first()
+            if not current:
+                logging.warning("Card not found for review_grade.")
+                return jsonify({"error": "Word not found"}), 404
+
+            schedule = schedule_review(*current, grade)
+            session.exec(update(model).where(*owned).values(**schedule))
+            session.commit()
+    except Exception:
+        logging.exception("Error while grading card.")
+        return jsonify({"error": "Database error"}), 500
+
+    return jsonify({"status": "ok", "interval_days": schedule["interval_days"],
+                    "due_at": schedule["due_at"].isoformat()}), 200
+
+
+
+#metrics view
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    token = app.config['METRICS_TOKEN']
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return jsonify({"error": "Unauthorized"}), 401
+
+    cache_stats = user_cache.stats()
+    fragment_stats = fragment_cache.stats()
+    search_stats = search_index.stats()
+    extra = [
+        ("user_cache_size", "gauge", cache_stats['size'], "Cached users in this process."),
+        ("user_cache_hits_total", "counter", cache_stats['hits'], "User cache hits."),
+        ("user_cache_misses_total", "counter", cache_stats['misses'], "User cache misses."),
+        ("fragment_cache_hits_total", "counter", fragment_stats['hits'], "Word table fragment cache hits."),
+        ("fragment_cache_misses_total", "counter", fragment_stats['misses'], "Word table fragment cache misses."),
+        ("search_index_buckets", "gauge", search_stats['size'], "Word search index buckets in this process."),
+        ("search_index_rows", "gauge", search_stats['rows'], "Rows held by the word search index in this process."),
+        ("search_index_rebuilds_total", "counter", search_stats['rebuilds'], "Word search index bucket builds."),
+        ("search_index_catch_ups_total", "counter", search_stats['catch_ups'],
+         "Word search index buckets brought up to date from newer rows and tombstones."),
+        ("auth_ip_throttled_total", "counter", auth_ip_limiter.rejected, "Auth attempts refused per client IP."),
+        ("auth_user_throttled_total", "counter", auth_user_limiter.rejected, "Auth attempts refused per username."),
+    ]
+    pool = get_engine().pool
+    if hasattr(pool, 'checkedout'):
+        extra += [
+            ("db_pool_size", "gauge", pool.size(), "Configured connection pool size."),
+            ("db_pool_checked_out", "gauge", pool.checkedout(), "Connections currently checked out."),
+            ("db_pool_overflow", "gauge", max(pool.overflow(), 0), "Connections open beyond the pool size."),
+        ]
+
+    response = make_response(request_metrics.render(extra))
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+
+#cli commands
+@app.cli.command("migrate")
+def migrate():
+    """Apply pending schema migrations."""
+    run_migrations(get_engine())
+    with request_session() as session:
+        versions = session.exec(select(SchemaMigration.version)).all()
+    click.echo(f"Schema at version {max(versions, default=0)}.")
+
+def build_assets(source_dir, output_dir):
+    # minify, fingerprint and precompress every top-level file in source_dir;
+    # returns the manifest {logical name: fingerprinted name}
+    import rcssmin
+    import rjsmin
+    if brotli is None:
+        logging.warning("brotli is not installed, skipping .br assets.")
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest, written = {}, set()
+    for name in sorted(os.listdir(source_dir)):
+        path = os.path.join(source_dir, name)
+        if not os.path.isfile(path):
+            continue
+        with open(path, "rb") as handle:
+            content = handle.read()
+
+        stem, ext = os.path.splitext(name)
+        if ext == ".js":
+            content = rjsmin.jsmin(content.decode("utf-8")).encode("utf-8")
+        elif ext == ".css":
+            content = rcssmin.cssmin(content.decode("utf-8")).encode("utf-8")
+
+        hashed = f"{stem}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+        outputs = {hashed: content}
+        if ext in ASSET_COMPRESSIBLE:
+            outputs[hashed + ".gz"] = gzip.compress(content, compresslevel=9, mtime=0)
+            if brotli is not None:
+                outputs[hashed + ".br"] = brotli.compress(content, quality=11)
+
+        for output_name, data in outputs.items():
+            with open(os.path.join(output_dir, output_name), "wb") as handle:
+                handle.write(data)
+        written.update(outputs)
+        manifest[name] = hashed
+
+    # drop files from earlier builds, then swap the manifest in atomically
+    for name in os.listdir(output_dir):
+        if name not in written and name != "manifest.json":
+            os.remove(os.path.join(output_dir, name))
+    manifest_tmp = os.path.join(output_dir, "manifest.json.tmp")
+    with open(manifest_tmp, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    os.replace(manifest_tmp, os.path.join(output_dir, "manifest.json"))
+    return manifest
+
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Build minified, fingerprinted and precompressed assets into static/dist."""
+    manifest = build_assets(app.static_folder, ASSET_DIR)
+    for name, hashed in manifest.items():
+        sizes = [os.path.getsize(os.path.join(app.static_folder, name))]
+        sizes += [os.path.getsize(os.path.join(ASSET_DIR, hashed + suffix))
+                  for suffix in ("", ".gz", ".br") if os.path.isfile(os.path.join(ASSET_DIR, hashed + suffix))]
+        click.echo(f"{name} -> {hashed}  " + " / ".join(f"{size:,} B" for size in sizes))
+
+@app.cli.command("prune-tombstones")
+@click.option("--days", default=90, show_default=True, help="Keep tombstones younger than this.")
+def prune_tombstones(days):
+    """Delete old tombstones; clients that synced before them get a full reset."""
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    with request_session() as session:
+        floors = session.exec(
+            select(Tombstone.user_id, Tombstone.table_name, func.max(Tombstone.sync_version))
+            .where(Tombstone.deleted_at < cutoff)
+            .group_by(Tombstone.user_id, Tombstone.table_name)
+        ).all()
+        for user_id, table_name, version in floors:
+            counter = session.get(UserCounter, (user_id, f"{table_name}:pruned"))
+            if counter is None:
+                session.add(UserCounter(user_id=user_id, name=f"{table_name}:pruned", value=version))
+            else:
+                counter.value = max(counter.value, version)
+        deleted = session.exec(delete(Tombstone).where(Tombstone.deleted_at < cutoff)).rowcount
+        session.commit()
+    click.echo(f"Deleted {deleted} tombstones older than {days} days.")
+
+@app.cli.command("load-verbs")
+@click.argument("csv_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--delimiter", default=";", show_default=True, help="CSV field delimiter.")
+@click.option("--chunk-size", default=500, show_default=True, help="Rows compared and written per chunk.")
+@click.option("--keep-missing", is_flag=True, help="Keep verbs that are not in the CSV.")
+def load_verbs(csv_path, delimiter, chunk_size, keep_missing):
+    """Upsert irregular verbs from CSV_PATH into the irregularVerbs table.
+
+    Rows are matched by infinitive, so only new or changed verbs are written.
+    Everything runs in one transaction: readers keep seeing the old table until
+    the commit and never an empty one.
+    """
+    columns = SEARCH_TABLES['irregularVerbs']['columns']
+    inserted = updated = unchanged = rejected = deleted = 0
+    seen = set()
+
+    with open(csv_path, newline="", encoding="utf-8-sig") as handle, Session(get_engine()) as session:
+        reader = csv.reader(handle, delimiter=delimiter)
+        header = next(reader, None)
+        if header is None:
+            raise click.ClickException("CSV file is empty.")
+
+        names = [name.strip().lower() for name in header]
+        if set(columns) <= set(names):
+            positions = [names.index(column) for column in columns]
+        else:
+            positions = list(range(len(columns)))
+            reader = itertools.chain([header], reader)
+
+        while True:
+            chunk = {}
+            for record in itertools.islice(reader, chunk_size):
+                try:
+                    values = {column: record[position].strip() for column, position in zip(columns, positions)}
+                except IndexError:
+                    rejected += 1
+                    continue
+                if not values['infinitive']:
+                    rejected += 1
+                    continue
+                chunk[values['infinitive']] = values
+            if not chunk:
+                break
+
+            existing = {
+                verb.infinitive: verb for verb in session.exec(
+                    select(irregularVerbs).where(irregularVerbs.infinitive.in_(chunk))
+                )
+            }
+            for infinitive, values in chunk.items():
+                seen.add(infinitive)
+                verb = existing.get(infinitive)
+                if verb is None:
+                    session.add(irregularVerbs(**values))
+                    inserted += 1
+                elif any(getattr(verb, column) != value for column, value in values.items()):
+                    for column, value in values.items():
+                        setattr(verb, column, value)
+                    updated += 1
+                else:
+                    unchanged += 1
+            session.flush()
+
+        if not keep_missing:
+            stale = [verb_id for verb_id, infinitive in session.exec(
+                select(irregularVerbs.id, irregularVerbs.infinitive)
+            ) if infinitive not in seen]
+            for start in range(0, len(stale), chunk_size):
+                session.exec(delete(irregularVerbs).where(irregularVerbs.id.in_(stale[start:start + chunk_size])))
+            deleted = len(stale)
+
+        session.commit()
+
+    irregular_cache.invalidate()
+    search_index.invalidate('irregularVerbs')
+    click.echo(f"{inserted} inserted, {updated} updated, {unchanged} unchanged, "
+               f"{deleted} deleted, {rejected} rejected.")
+
+
+
 #app route for homepage
 @app.route("/")
 def golden_gate():
     return render_template('base.html')
 
+
+
+#app factory
+def create_app():
+    """Return the app ready to serve: engine created, templates compiled.
+
+    Importing the module only registers routes. gunicorn's entry point is
+    app:create_app(); with preload_app the master runs this once and the
+    workers share the compiled templates copy-on-write. The schema is applied
+    at deploy time by `flask migrate` (AUTO_MIGRATE=1 runs it here instead).
+    """
+    started = time.perf_counter()
+    engine = get_engine()
+    if os.getenv('AUTO_MIGRATE', '0') == '1':
+        run_migrations(engine)
+    for name in app.jinja_env.list_templates(extensions=('html',)):
+        app.jinja_env.get_template(name)
+    load_asset_manifest()
+    logging.info("App ready in %.1f ms.", (time.perf_counter() - started) * 1000)
+    return app
+
+
 if __name__ == "__main__":
-    app.run()
\ No newline at end of file
+    create_app().run()
\ No newline at end of file
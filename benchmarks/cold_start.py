@@ -0,0 +1,151 @@
+"""Worker cold-start time, in process and under gunicorn.
+
+    python benchmarks/cold_start.py --runs 5 --workers 4
+
+In process, each run starts a fresh interpreter and times importing app.py,
+create_app() and the first request through the test client, once with the
+schema check at startup (AUTO_MIGRATE=1) and once without. Under gunicorn it
+times how long after launch every worker has loaded the app and answered,
+with and without preload_app, and reports each worker's private memory
+(Linux only), which is what preloading shares copy-on-write.
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PHASES = """
+import json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+flask_app = app.create_app()
+created = time.perf_counter()
+flask_app.test_client().get("/login")
+served = time.perf_counter()
+print(json.dumps({"import_ms": (imported - started) * 1000, "create_app_ms": (created - imported) * 1000,
+                  "first_request_ms": (served - created) * 1000, "total_ms": (served - started) * 1000}))
+"""
+
+BOOT_HOOK = """
+import os, time
+
+def post_worker_init(worker):
+    with open(os.environ["BENCH_BOOT_LOG"], "a") as handle:
+        handle.write(f"{os.getpid()} {time.time()}\\n")
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker-class", default="sync")
+    parser.add_argument("--json", help="write the results to this file")
+    return parser.parse_args()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def private_kib(pid):
+    # memory only this process has touched; pages still shared with the master are excluded
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as handle:
+            return sum(int(line.split()[1]) for line in handle if line.startswith(("Private_Clean", "Private_Dirty")))
+    except OSError:
+        return None
+
+
+def in_process(db_url, auto_migrate, runs):
+    env = dict(os.environ, SQL_DB=db_url, SECRET_KEY="bench", AUTO_MIGRATE=auto_migrate)
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PHASES], cwd=ROOT, env=env, check=True,
+                                capture_output=True, text=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {key: round(statistics.median(sample[key] for sample in samples), 1) for key in samples[0]}
+
+
+def under_gunicorn(db_url, preload, args, workdir):
+    config = os.path.join(workdir, "boot.conf.py")
+    with open(config, "w") as handle:
+        handle.write(open(os.path.join(ROOT, "gunicorn.conf.py")).read() + BOOT_HOOK)
+
+    boots = []
+    for _ in range(args.runs):
+        boot_log = os.path.join(workdir, "boot.log")
+        if os.path.exists(boot_log):
+            os.remove(boot_log)
+        port = free_port()
+        env = dict(os.environ, SQL_DB=db_url, SECRET_KEY="bench", GUNICORN_WORKER_CLASS=args.worker_class,
+                   WEB_CONCURRENCY=str(args.workers), GUNICORN_BIND=f"127.0.0.1:{port}",
+                   GUNICORN_PRELOAD="1" if preload else "0", BENCH_BOOT_LOG=boot_log)
+        started = time.time()
+        server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", config, "app:create_app()"],
+                                  cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while True:
+                try:
+                    urllib.request.urlopen(f"http://127.0.0.1:{port}/login").read()
+                    first_response = time.time()
+                    break
+                except (urllib.error.URLError, ConnectionError):
+                    time.sleep(0.01)
+            while not os.path.exists(boot_log) or len(open(boot_log).read().splitlines()) < args.workers:
+                time.sleep(0.01)
+            workers = [line.split() for line in open(boot_log).read().splitlines()]
+            # every worker answers once so the measured memory includes a served request
+            for _ in range(args.workers * 4):
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/login").read()
+            memory = [private_kib(int(pid)) for pid, _ in workers]
+            boots.append({"first_response_ms": (first_response - started) * 1000,
+                          "all_workers_ready_ms": (max(float(ready) for _, ready in workers) - started) * 1000,
+                          "private_kib_per_worker": statistics.mean(memory) if None not in memory else None})
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+    return {key: round(statistics.median(boot[key] for boot in boots), 1) if boots[0][key] is not None else None
+            for key in boots[0]}
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp()
+    db_url = f"sqlite:///{workdir}/cold.db"
+    env = dict(os.environ, SQL_DB=db_url, SECRET_KEY="bench")
+    subprocess.run([sys.executable, "-m", "flask", "--app", "app", "migrate"], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+
+    results = {}
+    try:
+        for label, auto_migrate in (("schema check at startup", "1"), ("deploy-time schema", "0")):
+            results[label] = in_process(db_url, auto_migrate, args.runs)
+            print(f"{label:26} " + "  ".join(f"{key} {value:7.1f}" for key, value in results[label].items()))
+        for label, preload in (("gunicorn", False), ("gunicorn --preload", True)):
+            results[label] = under_gunicorn(db_url, preload, args, workdir)
+            print(f"{label:26} " + "  ".join(f"{key} {value}" for key, value in results[label].items()))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump({"args": vars(args), "results": results}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Concurrent /insert from several client processes and threads against gunicorn.
+
+    python benchmarks/concurrent_inserts.py --processes 1 2 4 --threads 4 --inserts 25
+
+For each process count, seeds a throwaway SQLite database with one user,
+starts gunicorn, logs every client thread in, then lets processes x threads
+clients post --inserts words each to /insert at once. Afterwards it checks
+that every word was stored and that no two rows share a user_word_id, and
+prints inserts/s. Exits non-zero when a check fails.
+"""
+import argparse
+import http.cookiejar
+import json
+import multiprocessing
+import os
+import re
+import shutil
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "benchpass"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4], help="client process counts to run")
+    parser.add_argument("--threads", type=int, default=4, help="client threads per process")
+    parser.add_argument("--inserts", type=int, default=25, help="words posted by each thread")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--worker-class", default="gthread")
+    parser.add_argument("--json", help="write the results to this file")
+    return parser.parse_args()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed(db_url):
+    env = dict(os.environ, SQL_DB=db_url, SECRET_KEY="bench")
+    script = (
+        "import app\n"
+        "from sqlmodel import Session\n"
+        "from werkzeug.security import generate_password_hash\n"
+        "app.run_migrations(app.get_engine())\n"
+        "with Session(app.get_engine()) as s:\n"
+        f"    s.add(app.User(username='bench', password=generate_password_hash({PASSWORD!r})))\n"
+        "    s.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True)
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    # /insert answers with a redirect to the word table; only the insert is timed
+    def redirect_request(self, *args):
+        return None
+
+
+class Client:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        cookies = urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        self.opener = urllib.request.build_opener(cookies)
+        self.insert_opener = urllib.request.build_opener(cookies, NoRedirect())
+        self.csrf = None
+
+    def login(self):
+        page = self.opener.open(f"{self.base_url}/login").read().decode()
+        token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+        body = urllib.parse.urlencode({"csrf_token": token, "username": "bench", "password": PASSWORD}).encode()
+        page = self.opener.open(f"{self.base_url}/login", body).read().decode()
+        self.csrf = re.search(r'name="csrf-token" content="([^"]+)"', page).group(1)
+
+    def insert(self, german_word, translation):
+        body = urllib.parse.urlencode({"csrf_token": self.csrf, "german_word": german_word,
+                                       "german_translated_word": translation}).encode()
+        try:
+            self.insert_opener.open(f"{self.base_url}/insert", body).read()
+        except urllib.error.HTTPError as error:
+            if error.code != 302:
+                raise
+
+
+def client_process(base_url, process_index, args, barrier, errors):
+    clients = [Client(base_url) for _ in range(args.threads)]
+    try:
+        for client in clients:
+            client.login()
+    except Exception as error:
+        errors.put(f"login failed: {error!r}")
+        barrier.abort()
+        return
+    barrier.wait()
+
+    def drive(thread_index, client):
+        for step in range(args.inserts):
+            try:
+                client.insert(f"wort-{process_index}-{thread_index}-{step}", "word")
+            except Exception as error:
+                errors.put(repr(error))
+
+    threads = [threading.Thread(target=drive, args=(index, client)) for index, client in enumerate(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def run(processes, args):
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "inserts.db")
+    db_url = f"sqlite:///{path}"
+    seed(db_url)
+
+    port = free_port()
+    clients = processes * args.threads
+    env = dict(os.environ, SQL_DB=db_url, SECRET_KEY="bench", GUNICORN_WORKER_CLASS=args.worker_class,
+               WEB_CONCURRENCY=str(args.workers), GUNICORN_BIND=f"127.0.0.1:{port}",
+               PASSWORD_HASH_WORKERS="0", AUTH_RATE_PER_IP=f"{clients + 10}/1",
+               AUTH_RATE_PER_USER=f"{clients + 10}/1")
+    # logins are set up, not measured: hash inline and lift the auth limits
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:create_app()"],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"{base_url}/login").read()
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.1)
+
+        barrier = multiprocessing.Barrier(processes + 1)
+        errors = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=client_process, args=(base_url, index, args, barrier, errors))
+                   for index in range(processes)]
+        for worker in workers:
+            worker.start()
+        try:
+            barrier.wait(timeout=120)
+        except threading.BrokenBarrierError:
+            for worker in workers:
+                worker.join(timeout=5)
+                worker.terminate()
+            sys.exit(f"FAILED: {errors.get()}" if not errors.empty() else "FAILED: clients did not log in")
+        started = time.perf_counter()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    failures = []
+    while not errors.empty():
+        failures.append(errors.get())
+    with sqlite3.connect(path) as connection:
+        rows, distinct = connection.execute(
+            "SELECT count(*), count(DISTINCT user_word_id) FROM germanwords WHERE user_id = 1").fetchone()
+    shutil.rmtree(workdir, ignore_errors=True)
+    return {"processes": processes, "threads": args.threads, "sent": clients * args.inserts, "rows": rows,
+            "distinct_user_word_ids": distinct, "errors": len(failures), "inserts_per_s": rows / elapsed}
+
+
+def main():
+    args = parse_args()
+    results = []
+    for processes in args.processes:
+        result = run(processes, args)
+        results.append(result)
+        print(f"{processes:2} x {args.threads} clients  {result['inserts_per_s']:8.1f} inserts/s  "
+              f"rows {result['rows']}/{result['sent']}  distinct ids {result['distinct_user_word_ids']}  "
+              f"errors {result['errors']}")
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump({"args": vars(args), "results": results}, handle, indent=2)
+
+    for result in results:
+        if result['rows'] != result['distinct_user_word_ids']:
+            sys.exit(f"FAILED: duplicate user_word_id with {result['processes']} processes")
+        if result['rows'] != result['sent']:
+            sys.exit(f"FAILED: {result['sent'] - result['rows']} inserts lost with {result['processes']} processes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Concurrent load test of the JSON endpoints against real gunicorn workers.
+
+    python benchmarks/load_test.py --worker-class sync gthread --clients 50
+    python benchmarks/load_test.py --db-url postgresql://bench@127.0.0.1/bench_scratch \
+        --db-latency-ms 0 --i-know-this-drops-tables
+
+Each run seeds a database, starts gunicorn with the given worker class, logs
+every client in and then hammers /dictionary/update, /dictionary/update/batch
+and /notes/edit for --duration seconds.
+
+By default the database is a throwaway SQLite file and --db-latency-ms adds a
+time.sleep() before every SQL statement to stand in for a networked database;
+those numbers are synthetic and marked as such. --db-url runs against a real
+database instead. Seeding drops and recreates every table there, so it has to
+be confirmed with --i-know-this-drops-tables.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import re
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LATENCY_HOOK = """
+import os, time
+from sqlalchemy import event
+
+def post_worker_init(worker):
+    import app
+    delay = float(os.environ["BENCH_DB_LATENCY_MS"]) / 1000
+    event.listen(app.get_engine(), "before_cursor_execute", lambda *args: time.sleep(delay))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--worker-class", nargs="+", default=["sync", "gthread"], choices=["sync", "gthread"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--db-latency-ms", type=float, default=5.0, help="simulated latency per SQL statement")
+    parser.add_argument("--db-url", help="database to seed and use; default a throwaway SQLite file")
+    parser.add_argument("--i-know-this-drops-tables", action="store_true",
+                        help="allow seeding --db-url, which drops every table in it")
+    parser.add_argument("--json", help="write the results to this file")
+    return parser.parse_args()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seed(db_url, clients):
+    env = dict(os.environ, SQL_DB=db_url, SECRET_KEY="bench")
+    script = (
+        "import app\n"
+        "from sqlmodel import Session\n"
+        "from werkzeug.security import generate_password_hash\n"
+        "app.SQLModel.metadata.drop_all(app.get_engine())\n"
+        "app.run_migrations(app.get_engine())\n"
+        "with Session(app.get_engine()) as s:\n"
+        "    s.add(app.User(username='bench', password=generate_password_hash('benchpass')))\n"
+        "    s.commit()\n"
+        f"    for i in range(1, {clients} + 1):\n"
+        "        s.add(app.GermanWords(user_id=1, user_word_id=i, german_word=f'w{i}', german_translated_word=f't{i}'))\n"
+        "        s.add(app.Notes(user_id=1, user_note_id=i, title=f'n{i}', body='text'))\n"
+        "    s.commit()\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True)
+
+
+class Client:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self.csrf = None
+
+    def login(self):
+        page = self.opener.open(f"{self.base_url}/login").read().decode()
+        token = re.search(r'name="csrf_token" type="hidden" value="([^"]+)"', page).group(1)
+        body = urllib.parse.urlencode({"csrf_token": token, "username": "bench", "password": "benchpass"}).encode()
+        page = self.opener.open(f"{self.base_url}/login", body).read().decode()
+        self.csrf = re.search(r'name="csrf-token" content="([^"]+)"', page).group(1)
+
+    def post_json(self, path, payload):
+        request = urllib.request.Request(f"{self.base_url}{path}", json.dumps(payload).encode(), {
+            "Content-Type": "application/json", "X-CSRFToken": self.csrf})
+        with self.opener.open(request) as response:
+            response.read()
+
+
+def run(worker_class, args):
+    workdir = tempfile.mkdtemp()
+    db_url = args.db_url or f"sqlite:///{workdir}/load.db"
+    seed(db_url, args.clients)
+
+    config = os.path.join(workdir, "latency.conf.py")
+    with open(config, "w") as handle:
+        handle.write(open(os.path.join(ROOT, "gunicorn.conf.py")).read() + LATENCY_HOOK)
+
+    port = free_port()
+    env = dict(os.environ, SQL_DB=db_url, SECRET_KEY="bench",
+               GUNICORN_WORKER_CLASS=worker_class, WEB_CONCURRENCY=str(args.workers),
+               GUNICORN_BIND=f"127.0.0.1:{port}", BENCH_DB_LATENCY_MS=str(args.db_latency_ms),
+               AUTH_RATE_PER_IP=f"{args.clients * 2}/60", AUTH_RATE_PER_USER=f"{args.clients * 2}/60")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", config, "app:create_app()"],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"{base_url}/login").read()
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.1)
+
+        clients = [Client(base_url) for _ in range(args.clients)]
+        for client in clients:
+            client.login()
+
+        latencies, errors = [], []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.duration
+
+        def drive(index, client):
+            calls = [
+                ("/dictionary/update", {"id": index, "column": "german_word", "value": f"u{index}", "table": "GermanWords"}),
+                ("/dictionary/update/batch", {"table": "GermanWords", "changes": [
+                    {"id": index, "column": "german_translated_word", "value": f"b{index}"}]}),
+                ("/notes/edit", {"id": index, "title": f"n{index}", "body": "edited"}),
+            ]
+            step = 0
+            while time.perf_counter() < deadline:
+                path, payload = calls[step % len(calls)]
+                step += 1
+                started = time.perf_counter()
+                try:
+                    client.post_json(path, payload)
+                    elapsed = time.perf_counter() - started
+                    with lock:
+                        latencies.append(elapsed * 1000)
+                except Exception as error:
+                    with lock:
+                        errors.append(repr(error))
+
+        threads = [threading.Thread(target=drive, args=(index, client))
+                   for index, client in enumerate(clients, start=1)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    latencies.sort()
+    quantile = lambda q: latencies[min(int(q * len(latencies)), len(latencies) - 1)] if latencies else None
+    return {"worker_class": worker_class, "synthetic": not args.db_url,
+            "requests": len(latencies), "errors": len(errors),
+            "throughput_rps": len(latencies) / elapsed, "p50_ms": quantile(0.50),
+            "p95_ms": quantile(0.95), "p99_ms": quantile(0.99),
+            "mean_ms": statistics.mean(latencies) if latencies else None}
+
+
+def main():
+    args = parse_args()
+    if args.db_url and not args.i_know_this_drops_tables:
+        sys.exit("--db-url drops and recreates every table in that database; "
+                 "point it at a scratch database and add --i-know-this-drops-tables")
+    results = []
+    for worker_class in args.worker_class:
+        result = run(worker_class, args)
+        results.append(result)
+        print(f"{worker_class:8} {result['throughput_rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  "
+              f"p95 {result['p95_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms  errors {result['errors']}"
+              + ("  (synthetic: SQLite with simulated latency)" if result['synthetic'] else ""))
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump({"args": vars(args), "results": results}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
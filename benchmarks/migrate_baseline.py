@@ -0,0 +1,126 @@
+"""Migrate a database with the original schema to the latest version.
+
+    python benchmarks/migrate_baseline.py
+    python benchmarks/migrate_baseline.py --db germanflaskapp.db
+
+Creates a throwaway SQLite database with the tables as they were before the
+versioned migrations (or copies --db, which is left untouched), adds a few
+rows, then runs run_migrations() twice and checks that every migration is
+recorded, every table, column and index of the current models exists, the
+rows survived and the backfilled columns are set. Exits non-zero on the
+first failed check.
+"""
+import argparse
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the schema create_all produced for the original models
+BASELINE_SCHEMA = """
+CREATE TABLE user (
+    id INTEGER NOT NULL, username VARCHAR(50) NOT NULL, password VARCHAR(500) NOT NULL,
+    PRIMARY KEY (id), UNIQUE (username)
+);
+CREATE TABLE irregularverbs (
+    id INTEGER NOT NULL, infinitive VARCHAR(100) NOT NULL, second_third_infinitive VARCHAR(100) NOT NULL,
+    preterit VARCHAR(100) NOT NULL, perfekt VARCHAR(100) NOT NULL, translation VARCHAR(100) NOT NULL,
+    PRIMARY KEY (id)
+);
+CREATE TABLE germanwords (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, user_word_id INTEGER NOT NULL,
+    german_word VARCHAR(100) NOT NULL, german_translated_word VARCHAR(100) NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id)
+);
+CREATE TABLE notes (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, user_note_id INTEGER NOT NULL,
+    title VARCHAR(100) NOT NULL, body VARCHAR(5000) NOT NULL, created_at DATETIME,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id)
+);
+CREATE TABLE schweizwords (
+    id INTEGER NOT NULL, user_id INTEGER NOT NULL, user_word_id INTEGER NOT NULL,
+    schweiz_word VARCHAR(100) NOT NULL, schweiz_translated_german_word VARCHAR(100) NOT NULL,
+    schweiz_translated_word VARCHAR(100) NOT NULL,
+    PRIMARY KEY (id), FOREIGN KEY(user_id) REFERENCES user (id)
+);
+INSERT INTO user VALUES (1, 'alt', 'x');
+INSERT INTO irregularverbs VALUES (1, 'gehen', 'geht', 'ging', 'ist gegangen', 'to go');
+INSERT INTO germanwords VALUES (1, 1, 1, 'Haus', 'house'), (2, 1, 2, 'Bär', 'bear');
+INSERT INTO notes VALUES (1, 1, 1, 'Einkauf', 'Brot und Käse', '2024-01-01 10:00:00');
+INSERT INTO schweizwords VALUES (1, 1, 1, 'Grüezi', 'Guten Tag', 'hello');
+"""
+
+BACKFILLED = [
+    ("germanwords", "due_at"), ("schweizwords", "due_at"),
+    ("germanwords", "updated_at"), ("schweizwords", "updated_at"), ("notes", "updated_at"),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="migrate a copy of this SQLite file instead of the baseline schema")
+    return parser.parse_args()
+
+
+def check(condition, message):
+    if not condition:
+        sys.exit(f"FAILED: {message}")
+    print(f"ok  {message}")
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "baseline.db")
+    try:
+        if args.db:
+            shutil.copyfile(args.db, path)
+        else:
+            with sqlite3.connect(path) as connection:
+                connection.executescript(BASELINE_SCHEMA)
+        with sqlite3.connect(path) as connection:
+            tables = [name for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+            rows_before = {name: connection.execute(f'SELECT count(*) FROM "{name}"').fetchone()[0] for name in tables}
+
+        os.environ.update(SQL_DB=f"sqlite:///{path}", SECRET_KEY="check", AUTO_MIGRATE="0")
+        sys.path.insert(0, ROOT)
+        import app as app_module
+        from sqlalchemy import inspect, select
+
+        engine = app_module.get_engine()
+        for run in ("first", "second"):
+            app_module.run_migrations(engine)
+            print(f"ok  {run} run_migrations()")
+
+        with engine.connect() as connection:
+            applied = set(connection.execute(select(app_module.SchemaMigration.version)).scalars())
+        check(applied == {version for version, _, _ in app_module.MIGRATIONS},
+              f"migrations recorded: {sorted(applied)}")
+
+        inspector = inspect(engine)
+        for table in app_module.SQLModel.metadata.sorted_tables:
+            check(inspector.has_table(table.name), f"table {table.name}")
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            missing = [column.name for column in table.columns if column.name not in columns]
+            check(not missing, f"{table.name} columns (missing: {missing or 'none'})")
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            missing = [index.name for index in table.indexes if index.name not in indexes]
+            check(not missing, f"{table.name} indexes (missing: {missing or 'none'})")
+
+        with sqlite3.connect(path) as connection:
+            for name, count in rows_before.items():
+                check(connection.execute(f'SELECT count(*) FROM "{name}"').fetchone()[0] == count,
+                      f"{name} keeps its {count} rows")
+            for table, column in BACKFILLED:
+                nulls = connection.execute(f"SELECT count(*) FROM {table} WHERE {column} IS NULL").fetchone()[0]
+                check(nulls == 0, f"{table}.{column} backfilled")
+        engine.dispose()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Query plans and latency of the hot per-user queries, with and without the
+composite user_id indexes.
+
+    python benchmarks/query_plans.py --rows 1000000 --users 100
+
+Seeds a throwaway SQLite database through the app's models, then runs each
+query without the composite indexes ("before") and with them ("after").
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per word/note table")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per query")
+    parser.add_argument("--db", help="SQLite file to use (default: a temporary file)")
+    return parser.parse_args()
+
+
+def seed(app_module, rows, users):
+    from sqlalchemy import insert
+    from datetime import datetime, timedelta
+
+    rnd = random.Random(7)
+    start = datetime(2024, 1, 1)
+    with app_module.get_engine().begin() as connection:
+        connection.execute(insert(app_module.User), [
+            {"username": f"user{user_id}", "password": "x"} for user_id in range(1, users + 1)
+        ])
+        counters = {}
+        for chunk_start in range(0, rows, 50_000):
+            words, notes, schweiz = [], [], []
+            for _ in range(chunk_start, min(chunk_start + 50_000, rows)):
+                user_id = rnd.randint(1, users)
+                counters[user_id] = counters.get(user_id, 0) + 1
+                number = counters[user_id]
+                words.append({"user_id": user_id, "user_word_id": number,
+                              "german_word": f"wort{number}", "german_translated_word": f"word{number}"})
+                schweiz.append({"user_id": user_id, "user_word_id": number, "schweiz_word": f"wort{number}",
+                                "schweiz_translated_german_word": "x", "schweiz_translated_word": "y"})
+                notes.append({"user_id": user_id, "user_note_id": number, "title": f"note {number}",
+                              "body": "text", "created_at": start + timedelta(minutes=number)})
+            connection.execute(insert(app_module.GermanWords), words)
+            connection.execute(insert(app_module.SchweizWords), schweiz)
+            connection.execute(insert(app_module.Notes), notes)
+
+
+def hot_queries(app_module, user_id):
+    from sqlalchemy import select, func
+    GermanWords, SchweizWords, Notes = app_module.GermanWords, app_module.SchweizWords, app_module.Notes
+    return {
+        "words first page": select(GermanWords).where(GermanWords.user_id == user_id)
+            .order_by(GermanWords.user_word_id).limit(101),
+        "words keyset page": select(GermanWords).where(GermanWords.user_id == user_id,
+                                                       GermanWords.user_word_id > 5000)
+            .order_by(GermanWords.user_word_id).limit(101),
+        "schweiz first page": select(SchweizWords).where(SchweizWords.user_id == user_id)
+            .order_by(SchweizWords.user_word_id).limit(101),
+        "notes by created_at": select(Notes).where(Notes.user_id == user_id)
+            .order_by(Notes.created_at.desc()).limit(50),
+        "max user_word_id": select(func.max(GermanWords.user_word_id)).where(GermanWords.user_id == user_id),
+        "max user_note_id": select(func.max(Notes.user_note_id)).where(Notes.user_id == user_id),
+    }
+
+
+def measure(app_module, repeat, users):
+    results = {}
+    with app_module.get_engine().connect() as connection:
+        for name, query in hot_queries(app_module, users // 2 or 1).items():
+            compiled = query.compile(app_module.get_engine(), compile_kwargs={"literal_binds": True})
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}").fetchall()
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                connection.execute(query).fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = {"plan": " | ".join(row[-1] for row in plan),
+                             "median_ms": statistics.median(timings)}
+    return results
+
+
+def main():
+    args = parse_args()
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["SQL_DB"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("SECRET_KEY", "bench")
+    sys.path.insert(0, ROOT)
+    import app as app_module
+
+    composite = [index for table in app_module.SQLModel.metadata.sorted_tables
+                 for index in table.indexes if index.name.startswith(("ix_germanwords_user_id",
+                                                                      "ix_schweizwords_user_id",
+                                                                      "ix_notes_user_id"))]
+
+    app_module.run_migrations(app_module.get_engine())
+    started = time.perf_counter()
+    seed(app_module, args.rows, args.users)
+    print(f"seeded {args.rows} rows per table for {args.users} users in {time.perf_counter() - started:.1f}s")
+
+    with app_module.get_engine().begin() as connection:
+        for index in composite:
+            index.drop(connection, checkfirst=True)
+        connection.exec_driver_sql("ANALYZE")
+    before = measure(app_module, args.repeat, args.users)
+
+    with app_module.get_engine().begin() as connection:
+        for index in composite:
+            index.create(connection, checkfirst=True)
+        connection.exec_driver_sql("ANALYZE")
+    after = measure(app_module, args.repeat, args.users)
+
+    for name in before:
+        print(f"\n{name}")
+        print(f"  before {before[name]['median_ms']:9.3f} ms  {before[name]['plan']}")
+        print(f"  after  {after[name]['median_ms']:9.3f} ms  {after[name]['plan']}")
+
+
+if __name__ == "__main__":
+    main()
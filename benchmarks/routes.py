@@ -0,0 +1,368 @@
+"""Latency, throughput and queries per request of the main routes.
+
+    python benchmarks/routes.py --users 20 --words 2000 --notes 200 --json results.json
+    python benchmarks/routes.py --mode gunicorn --compare results.json
+
+Seeds a throwaway SQLite database through the app's models, then drives
+/insert, /schweiz, /irregular, /notes, /dictionary/update and /notes/edit
+through the Flask test client (one request at a time, in process) and through
+a real gunicorn server (--clients concurrent logged-in clients for --duration
+seconds). Queries per request are counted in process for the test client;
+under gunicorn they are the change in each worker's /metrics query and
+request counters over the run, which includes the statements a streamed page
+runs after its headers are sent.
+--json stores the results together with the current commit; --compare prints
+the change against such a file.
+"""
+import argparse
+import datetime
+import http.cookiejar
+import json
+import os
+import random
+import re
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = "benchpass"
+
+# endpoint names of the routed paths, as labelled in /metrics
+ENDPOINTS = {"/insert": "insert", "/schweiz": "schweiz", "/irregular": "irregular", "/notes": "notes",
+             "/dictionary/update": "update_word", "/notes/edit": "edit_note"}
+
+# (name, method, path, payload factory(user id, step, args) or None); seed_models
+# inserts each user's words and notes as one block, so row ids are predictable
+ROUTES = [
+    ("GET /insert", "GET", "/insert", None),
+    ("GET /schweiz", "GET", "/schweiz", None),
+    ("GET /irregular", "GET", "/irregular", None),
+    ("GET /notes", "GET", "/notes", None),
+    ("POST /dictionary/update", "POST", "/dictionary/update",
+     lambda user_id, step, args: {"table": "GermanWords", "id": (user_id - 1) * args.words + step % args.words + 1,
+                                  "column": "german_word", "value": f"wort{step}"}),
+    ("POST /notes/edit", "POST", "/notes/edit",
+     lambda user_id, step, args: {"id": (user_id - 1) * args.notes + step % args.notes + 1,
+                                  "title": f"Notiz {step}", "body": f"bearbeitet {step}"}),
+]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", nargs="+", choices=["testclient", "gunicorn"], default=["testclient", "gunicorn"])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--words", type=int, default=2000, help="German and Swiss words per user")
+    parser.add_argument("--notes", type=int, default=200, help="notes per user")
+    parser.add_argument("--verbs", type=int, default=200, help="irregular verbs")
+    parser.add_argument("--requests", type=int, default=200, help="test client requests per route")
+    parser.add_argument("--clients", type=int, default=20, help="concurrent gunicorn clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="gunicorn run length in seconds")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--worker-class", default="sync")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="print the change against an earlier --json file")
+    return parser.parse_args()
+
+
+def bench_env(db_url, args):
+    # logins are set up, not measured: hash inline and lift the auth limits
+    return {"SQL_DB": db_url, "SECRET_KEY": "bench", "PASSWORD_HASH_WORKERS": "0",
+            "AUTH_RATE_PER_IP": f"{args.clients + args.users + 10}/1", "AUTH_RATE_PER_USER": f"{args.clients + 10}/1"}
+
+
+def seed(db_url, args):
+    # run in a child process so the test client run imports the app fresh
+    script = (
+        "import sys\n"
+        f"sys.path.insert(0, {ROOT!r})\n"
+        f"sys.path.insert(0, {os.path.dirname(os.path.abspath(__file__))!r})\n"
+        "import app, routes\n"
+        f"routes.seed_models(app, {args.users}, {args.words}, {args.notes}, {args.verbs})\n"
+    )
+    env = dict(os.environ, **bench_env(db_url, args))
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True)
+
+
+def seed_models(app_module, users, words, notes, verbs):
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+
+    rnd = random.Random(7)
+    start = datetime.datetime(2024, 1, 1)
+    password = generate_password_hash(PASSWORD, os.getenv("PASSWORD_HASH_METHOD", "scrypt:32768:8:1"))
+    app_module.run_migrations(app_module.get_engine())
+    with app_module.get_engine().begin() as connection:
+        connection.execute(insert(app_module.User), [
+            {"username": f"bench{user_id}", "password": password} for user_id in range(1, users + 1)
+        ])
+        connection.execute(insert(app_module.irregularVerbs), [
+            {"infinitive": f"verb{number}", "second_third_infinitive": f"verbt{number}", "preterit": f"verbte{number}",
+             "perfekt": f"geverbt{number}", "translation": f"to verb {number}"} for number in range(1, verbs + 1)
+        ])
+        for user_id in range(1, users + 1):
+            connection.execute(insert(app_module.GermanWords), [
+                {"user_id": user_id, "user_word_id": number, "german_word": f"wort{number}",
+                 "german_translated_word": f"word{rnd.randint(1, words)}"} for number in range(1, words + 1)
+            ])
+            connection.execute(insert(app_module.SchweizWords), [
+                {"user_id": user_id, "user_word_id": number, "schweiz_word": f"wörtli{number}",
+                 "schweiz_translated_german_word": f"wort{number}", "schweiz_translated_word": f"word{number}"}
+                for number in range(1, words + 1)
+            ])
+            connection.execute(insert(app_module.Notes), [
+                {"user_id": user_id, "user_note_id": number, "title": f"Notiz {number}",
+                 "body": "Text " * rnd.randint(5, 200), "created_at": start + datetime.timedelta(minutes=number)}
+                for number in range(1, notes + 1)
+            ])
+
+
+def summarize(latencies, elapsed, queries_per_request):
+    latencies = sorted(latencies)
+    if not latencies:
+        return {"requests": 0}
+    quantile = lambda q: round(latencies[min(int(q * len(latencies)), len(latencies) - 1)], 3)
+    return {"requests": len(latencies), "throughput_rps": round(len(latencies) / elapsed, 1),
+            "p50_ms": quantile(0.50), "p95_ms": quantile(0.95), "p99_ms": quantile(0.99),
+            "mean_ms": round(statistics.mean(latencies), 3),
+            "queries_per_request": round(queries_per_request, 2) if queries_per_request is not None else None}
+
+
+CSRF_FORM = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+CSRF_META = re.compile(r'name="csrf-token" content="([^"]+)"')
+
+
+def run_testclient(db_url, args):
+    os.environ.update(bench_env(db_url, args))
+    sys.path.insert(0, ROOT)
+    import app as app_module
+    from sqlalchemy import event
+
+    client = app_module.create_app().test_client()
+    page = client.get("/login").get_data(as_text=True)
+    page = client.post("/login", data={"csrf_token": CSRF_FORM.search(page).group(1), "username": "bench1",
+                                       "password": PASSWORD}, follow_redirects=True).get_data(as_text=True)
+    headers = {"X-CSRFToken": CSRF_META.search(page).group(1)}
+
+    # counted in process, so statements run while a streamed page is sent are included
+    queries = [0]
+    event.listen(app_module.get_engine(), "before_cursor_execute", lambda *_: queries.__setitem__(0, queries[0] + 1))
+
+    def call(path, method, payload):
+        # get_data() reads streamed pages to the end, like a server would
+        response = client.open(path, method=method, json=payload, headers=headers)
+        response.get_data()
+        response.close()
+        return response
+
+    results = {}
+    for name, method, path, payload in ROUTES:
+        for step in range(5):  # warm caches and the connection pool
+            call(path, method, payload(1, step, args) if payload else None)
+        samples = []
+        started = time.perf_counter()
+        for step in range(args.requests):
+            queries[0] = 0
+            request_started = time.perf_counter()
+            response = call(path, method, payload(1, step, args) if payload else None)
+            elapsed = (time.perf_counter() - request_started) * 1000
+            if response.status_code != 200:
+                raise SystemExit(f"{name} answered {response.status_code}")
+            samples.append((elapsed, queries[0]))
+        results[name] = summarize([ms for ms, _ in samples], time.perf_counter() - started,
+                                  statistics.mean(count for _, count in samples))
+    return results
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class Client:
+    def __init__(self, base_url, user_id):
+        self.base_url = base_url
+        self.user_id = user_id
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self.csrf = None
+
+    def login(self):
+        page = self.opener.open(f"{self.base_url}/login").read().decode()
+        body = urllib.parse.urlencode({"csrf_token": CSRF_FORM.search(page).group(1), "username": f"bench{self.user_id}",
+                                       "password": PASSWORD}).encode()
+        page = self.opener.open(f"{self.base_url}/login", body).read().decode()
+        self.csrf = CSRF_META.search(page).group(1)
+
+    def call(self, method, path, payload):
+        data = json.dumps(payload).encode() if payload is not None else None
+        request = urllib.request.Request(f"{self.base_url}{path}", data, {
+            "Content-Type": "application/json", "X-CSRFToken": self.csrf}, method=method)
+        with self.opener.open(request) as response:
+            response.read()
+
+
+METRIC_LINE = re.compile(r'^(http_request_db_queries_total|http_request_duration_seconds_count)'
+                         r'\{method="(\w+)",endpoint="(\w+)"\} (\d+)$', re.M)
+
+
+def scrape_route_counters(base_url, workers):
+    """Per-route (queries, requests) summed over every gunicorn worker.
+
+    Each worker keeps its own counters and answers /metrics for itself only,
+    so the endpoint is scraped until every worker has been seen; while no
+    other requests run, the same worker always returns the same counters.
+    """
+    seen = set()
+    for _ in range(workers * 50):
+        body = urllib.request.urlopen(f"{base_url}/metrics").read().decode()
+        seen.add(tuple(sorted((name, method, endpoint, int(value))
+                              for name, method, endpoint, value in METRIC_LINE.findall(body))))
+        if len(seen) == workers:
+            break
+    else:
+        raise SystemExit(f"saw {len(seen)} of {workers} workers on /metrics")
+
+    totals = defaultdict(lambda: [0, 0])
+    for counters in seen:
+        for name, method, endpoint, value in counters:
+            totals[(method, endpoint)][name == "http_request_duration_seconds_count"] += value
+    return totals
+
+
+def run_gunicorn(db_url, args):
+    port = free_port()
+    env = dict(os.environ, **bench_env(db_url, args), GUNICORN_WORKER_CLASS=args.worker_class,
+               WEB_CONCURRENCY=str(args.workers), GUNICORN_BIND=f"127.0.0.1:{port}")
+    server = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app:create_app()"],
+                              cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(f"{base_url}/login").read()
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.1)
+
+        clients = [Client(base_url, index % args.users + 1) for index in range(args.clients)]
+        for client in clients:
+            client.login()
+        before = scrape_route_counters(base_url, args.workers)
+
+        samples = {name: [] for name, *_ in ROUTES}
+        errors = []
+        lock = threading.Lock()
+        deadline = time.perf_counter() + args.duration
+
+        def drive(index, client):
+            step = index  # stagger the clients across the route list
+            while time.perf_counter() < deadline:
+                name, method, path, payload = ROUTES[step % len(ROUTES)]
+                step += 1
+                started = time.perf_counter()
+                try:
+                    client.call(method, path, payload(client.user_id, step, args) if payload else None)
+                    with lock:
+                        samples[name].append((time.perf_counter() - started) * 1000)
+                except Exception as error:
+                    with lock:
+                        errors.append(repr(error))
+
+        threads = [threading.Thread(target=drive, args=(index, client)) for index, client in enumerate(clients)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        after = scrape_route_counters(base_url, args.workers)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    results, run_queries, run_requests = {}, 0, 0
+    for name, method, path, _ in ROUTES:
+        key = (method, ENDPOINTS[path])
+        queries, requests = (after[key][index] - before[key][index] for index in (0, 1))
+        run_queries, run_requests = run_queries + queries, run_requests + requests
+        results[name] = summarize(samples[name], elapsed, queries / requests if requests else None)
+    results["all"] = dict(summarize([ms for route in samples.values() for ms in route], elapsed,
+                                    run_queries / run_requests if run_requests else None), errors=len(errors))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(mode, results, baseline):
+    print(f"\n{mode}")
+    print(f"  {'route':26} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8}")
+    for name, result in results.items():
+        if not result.get("requests"):
+            print(f"  {name:26} no requests")
+            continue
+        queries = result['queries_per_request']
+        line = (f"  {name:26} {result['throughput_rps']:8.1f} {result['p50_ms']:8.2f} {result['p95_ms']:8.2f} "
+                f"{result['p99_ms']:8.2f} " + (f"{queries:8.2f}" if queries is not None else f"{'-':>8}"))
+        before = (baseline or {}).get(mode, {}).get(name)
+        if before and before.get("requests"):
+            line += (f"   p50 {(result['p50_ms'] / before['p50_ms'] - 1) * 100:+.0f}%"
+                     f"  req/s {(result['throughput_rps'] / before['throughput_rps'] - 1) * 100:+.0f}%")
+            if queries is not None and before.get('queries_per_request') is not None:
+                line += f"  queries {queries - before['queries_per_request']:+.2f}"
+        print(line)
+
+
+def main():
+    args = parse_args()
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+
+    workdir = tempfile.mkdtemp()
+    db_url = f"sqlite:///{workdir}/routes.db"
+    started = time.perf_counter()
+    seed(db_url, args)
+    print(f"seeded {args.users} users with {args.words} words and {args.notes} notes each "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    report = {"commit": git_commit(), "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+              "args": {key: value for key, value in vars(args).items() if key not in ("json", "compare")}}
+    try:
+        # gunicorn first: the test client run imports the app into this process
+        if "gunicorn" in args.mode:
+            report["gunicorn"] = run_gunicorn(db_url, args)
+            print_results("gunicorn", report["gunicorn"], baseline)
+            print(f"  errors {report['gunicorn']['all']['errors']}")
+        if "testclient" in args.mode:
+            report["testclient"] = run_testclient(db_url, args)
+            print_results("testclient", report["testclient"], baseline)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if baseline and baseline.get("commit"):
+        print(f"\ncompared with {baseline['commit']} ({baseline.get('created_at')})")
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
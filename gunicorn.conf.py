@@ -0,0 +1,29 @@
+import os
+import multiprocessing
+import sys
+
+
+# sync (default) holds one worker per request for its whole DB round trip;
+# gthread serves GUNICORN_THREADS requests per worker, so a worker keeps
+# answering inline edits while one of its threads waits on the database.
+# The app's sessions are synchronous: async worker classes are not supported
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+if worker_class not in ("sync", "gthread"):
+    raise RuntimeError(f"GUNICORN_WORKER_CLASS must be sync or gthread, not {worker_class!r}")
+workers = int(os.getenv("WEB_CONCURRENCY", str(min(multiprocessing.cpu_count() * 2 + 1, 8))))
+threads = int(os.getenv("GUNICORN_THREADS", "8" if worker_class == "gthread" else "1"))
+
+bind = os.getenv("GUNICORN_BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+
+# GUNICORN_PRELOAD=1 builds the app once in the master (app:create_app()) and
+# forks ready workers that share its memory copy-on-write.
+preload_app = os.getenv("GUNICORN_PRELOAD", "0") == "1"
+
+
+def post_fork(server, worker):
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.dispose_engine()
@@ -10,15 +10,10 @@ document.addEventListener('DOMContentLoaded', function () {
     }
 
     if (!isMobileDevice()) {
-<<<<<<< HEAD
-        window.location.href = "/unsupported";
-        return; //
-=======
         if (window.location && window.location.pathname !== '/unsupported') {
             window.location.href = "/unsupported";
         }
         return;
->>>>>>> dae0b22db5d8a28c9f204dfe4e4b557cba901ceb
     }
     csrfToken = document.querySelector('meta[name="csrf-token"]').getAttribute('content');
     initializeEventListeners();
@@ -26,7 +21,12 @@ document.addEventListener('DOMContentLoaded', function () {
     setupLongPressEditing();
     setupNoteSaving();
     setupEditSaving();
-    setupLongPressEditingDictionary();
+    setupWordTables();
+    setupInfiniteScroll();
+    setupWordImport();
+    setupReview();
+    setupNotesFeed();
+    setupOfflineSync();
     setupPasswordToggles();
     autoDismissFlashAlerts(1500);
 });
@@ -70,44 +70,58 @@ async function postJSON(url, data) {
 // SEARCH INPUT EVENT SETUP
 function initializeEventListeners() {
     const inputInsert = document.querySelector('#search_input_text_insert');
-    if (inputInsert) inputInsert.addEventListener('input', filterWordsDictionary);
+    if (inputInsert) setupWordSearch(inputInsert, document.querySelector('.table-dictionary tbody'));
 
     const inputIrregular = document.querySelector('#search_input_text_irregular');
-    if (inputIrregular) inputIrregular.addEventListener('input', filterWordsIrregular);
+    if (inputIrregular) setupWordSearch(inputIrregular, document.querySelector('.table-irregular tbody'));
 
     const inputSchweiz = document.querySelector('#search_input_text_schweiz');
-    if (inputSchweiz) inputSchweiz.addEventListener('input', filterWordsSchweiz);
+    if (inputSchweiz) setupWordSearch(inputSchweiz, document.querySelector('table.table-schweiz tbody'));
 }
 
 
 
-// FILTER FUNCTIONS
-function filterWordsDictionary() {
-    const filter = document.querySelector('#search_input_text_insert').value.toLowerCase();
+// SERVER-SIDE WORD SEARCH (debounced requests to /dictionary/search)
+function setupWordSearch(input, tbody, debounceMs = 250) {
+    if (!input || !tbody) return;
 
-    document.querySelectorAll('.word_row').forEach(row => {
-        const german = row.querySelector('td:nth-child(2)').innerText.toLowerCase();
-        const translated = row.querySelector('td:nth-child(3)').innerText.toLowerCase();
+    let timer = null;
+    let originalRows = null;
+    let latestRequest = 0;
 
-        row.style.display = (german.includes(filter) || translated.includes(filter)) ? '' : 'none';
-    });
-}
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+            const query = input.value.trim();
 
-function filterWordsIrregular() {
-    const filter = document.querySelector('#search_input_text_irregular').value.toLowerCase();
-
-    document.querySelectorAll('.word_row').forEach(row => {
-        const fields = Array.from(row.querySelectorAll('td')).map(td => td.innerText.toLowerCase());
-        row.style.display = fields.some(field => field.includes(filter)) ? '' : 'none';
-    });
-}
-
-function filterWordsSchweiz() {
-    const filter = document.querySelector('#search_input_text_schweiz').value.toLowerCase();
+            if (!query) {
+                if (originalRows) tbody.replaceChildren(...originalRows);
+                originalRows = null;
+                return;
+            }
 
-    document.querySelectorAll('.word_row').forEach(row => {
-        const fields = Array.from(row.querySelectorAll('td')).map(td => td.innerText.toLowerCase());
-        row.style.display = fields.some(field => field.includes(filter)) ? '' : 'none';
+            const requestId = ++latestRequest;
+            const params = new URLSearchParams({ table: tbody.dataset.table, q: query });
+            try {
+                let data;
+                try {
+                    const res = await fetch(`/dictionary/search?${params}`, { credentials: 'same-origin' });
+                    if (!res.ok) return;
+                    data = await res.json();
+                } catch (err) {
+                    // offline: search the IndexedDB copy instead
+                    data = { words: await searchLocalWords(tbody.dataset.table, query) };
+                }
+                if (requestId !== latestRequest) return;
+
+                if (!originalRows) originalRows = Array.from(tbody.children);
+                tbody.innerHTML = data.words.map(word => tbody.dataset.table === 'irregularVerbs'
+                    ? renderVerbRow(word)
+                    : renderWordRow(word, tbody.dataset.table, tbody.dataset.deleteUrl)).join('');
+            } catch (err) {
+                console.error('Word search failed:', err);
+            }
+        }, debounceMs);
     });
 }
 
@@ -129,54 +143,244 @@ function setupNavbarHiding() {
 
 
 
-// LONG PRESS INLINE EDIT FOR DICTIONARY WORDS (pointer-based)
-function setupLongPressEditingDictionary() {
-    const LONG_PRESS_DURATION = 600;
-    const editableCells = document.querySelectorAll('.editable-word');
-
-    editableCells.forEach(cell => {
-        let pressTimer = null;
-        let pointerDown = false;
+// WORD TABLE EVENTS (one delegated listener per tbody instead of handlers on every cell)
+const LONG_PRESS_DURATION = 600;
+const WORD_TABLE_EVENTS = window.PointerEvent
+    ? ['click', 'dblclick', 'submit', 'pointerdown', 'pointerup', 'pointerout', 'pointercancel']
+    : ['click', 'dblclick', 'submit', 'mousedown', 'mouseup', 'mouseout', 'touchstart', 'touchend', 'touchcancel'];
 
-        const startPress = (ev) => {
-            console.debug('long-press start on', cell, 'event:', ev && ev.type);
-            if (ev && ev.preventDefault) ev.preventDefault();
-            pointerDown = true;
-            cell.style.userSelect = 'none';
+function setupWordTables() {
+    document.querySelectorAll('tbody[data-table]').forEach(tbody => {
+        let press = null;
 
-            pressTimer = setTimeout(() => {
-                if (pointerDown) {
-                    console.debug('long-press threshold reached for', cell);
-                    enableInlineEdit(cell);
-                }
-            }, LONG_PRESS_DURATION);
+        const cancelPress = () => {
+            if (!press) return;
+            clearTimeout(press.timer);
+            press.cell.style.userSelect = '';
+            press = null;
         };
 
-        const cancelPress = () => {
-            pointerDown = false;
-            clearTimeout(pressTimer);
-            cell.style.userSelect = '';
+        const onEvent = (ev) => {
+            if (ev.type === 'submit') {
+                if (ev.target.matches('.delete-word-form') && !confirm('Willst du dieses Wort löschen?')) ev.preventDefault();
+                return;
+            }
+            if (ev.type === 'pointerout' || ev.type === 'mouseout') {
+                // pointerleave does not bubble; out events also fire between a cell's own children
+                if (press && !press.cell.contains(ev.relatedTarget)) cancelPress();
+                return;
+            }
+            if (['pointerup', 'pointercancel', 'mouseup', 'touchend', 'touchcancel'].includes(ev.type)) {
+                cancelPress();
+                return;
+            }
+
+            const cell = ev.target.closest('td.editable-word, td[data-editable="false"]');
+            if (!cell || !tbody.contains(cell)) return;
+
+            if (ev.type === 'click') {
+                toggleVisibility(cell);
+            } else if (ev.type === 'dblclick') {
+                enableInlineEdit(cell);
+            } else if (cell.classList.contains('editable-word')) {
+                ev.preventDefault();
+                cancelPress();
+                cell.style.userSelect = 'none';
+                press = {
+                    cell: cell,
+                    timer: setTimeout(() => {
+                        press = null;
+                        enableInlineEdit(cell);
+                    }, LONG_PRESS_DURATION)
+                };
+            }
         };
 
-        if (window.PointerEvent) {
-            cell.addEventListener('pointerdown', startPress);
-            cell.addEventListener('pointerup', cancelPress);
-            cell.addEventListener('pointerleave', cancelPress);
-            cell.addEventListener('pointercancel', cancelPress);
-        } else {
-            cell.addEventListener('mousedown', startPress);
-            cell.addEventListener('mouseup', cancelPress);
-            cell.addEventListener('mouseleave', cancelPress);
-            cell.addEventListener('touchstart', startPress, { passive: false });
-            cell.addEventListener('touchend', cancelPress);
-            cell.addEventListener('touchcancel', cancelPress);
+        WORD_TABLE_EVENTS.forEach(type => tbody.addEventListener(type, onEvent, type === 'touchstart' ? { passive: false } : undefined));
+    });
+}
+
+
+
+// INFINITE SCROLL FOR WORD TABLES (keyset pages from /dictionary/page)
+const WORD_TABLE_COLUMNS = {
+    GermanWords: ['german_word', 'german_translated_word'],
+    SchweizWords: ['schweiz_word', 'schweiz_translated_german_word', 'schweiz_translated_word']
+};
+
+function setupInfiniteScroll() {
+    const tbody = document.querySelector('tbody[data-next-cursor]');
+    if (!tbody || !tbody.dataset.nextCursor || !('IntersectionObserver' in window)) return;
+
+    const sentinel = document.createElement('tr');
+    sentinel.className = 'page-sentinel';
+    tbody.appendChild(sentinel);
+
+    let loading = false;
+    const observer = new IntersectionObserver(async (entries) => {
+        if (loading || !entries.some(entry => entry.isIntersecting)) return;
+        loading = true;
+        const more = await loadNextWordsPage(tbody, sentinel);
+        loading = false;
+        if (!more) {
+            observer.disconnect();
+            sentinel.remove();
+        }
+    }, { root: tbody, rootMargin: '200px' });
+
+    observer.observe(sentinel);
+}
+
+async function loadNextWordsPage(tbody, sentinel) {
+    const cursor = tbody.dataset.nextCursor;
+    if (!cursor) return false;
+
+    const table = tbody.dataset.table;
+    const offset = tbody.querySelectorAll('.word_row').length;
+    const params = new URLSearchParams({ table: table, after: cursor, offset: offset });
+
+    try {
+        // a synced IndexedDB copy serves the next page without a request
+        let data = await localWordsPage(table, Number(cursor), offset);
+        if (!data) {
+            const res = await fetch(`/dictionary/page?${params}`, { credentials: 'same-origin' });
+            if (!res.ok) return false;
+            data = await res.json();
         }
 
-        cell.addEventListener('dblclick', () => {
-            console.debug('dblclick triggers enableInlineEdit on', cell);
-            enableInlineEdit(cell);
+        const html = data.words.map(word => renderWordRow(word, table, tbody.dataset.deleteUrl)).join('');
+        sentinel.insertAdjacentHTML('beforebegin', html);
+
+        tbody.dataset.nextCursor = data.next_cursor === null ? '' : data.next_cursor;
+        return data.next_cursor !== null;
+    } catch (err) {
+        console.error('Loading next words page failed:', err);
+        return false;
+    }
+}
+
+function renderWordRow(word, table, deleteUrl) {
+    const csrf = getCsrfToken() || '';
+    const cells = WORD_TABLE_COLUMNS[table].map(column => {
+        const value = escapeHtml(String(word[column] ?? ''));
+        return `
+        <td class="editable-word" data-word-id="${word.id}" data-column="${column}">
+            <div>${value}</div>
+            <input type="hidden" name="${column}_${word.id}" value="${value}">
+        </td>`;
+    }).join('');
+
+    return `
+    <tr class="word_row">
+        <td>
+            <form class="delete-word-form" method="POST" action="${deleteUrl}">
+                <input type="hidden" name="csrf_token" value="${csrf}">
+                <input type="hidden" name="word_id" value="${word.id}">
+                <button type="submit" class="btn-id">
+                    ${word.ordinal}
+                </button>
+            </form>
+        </td>${cells}
+    </tr>`;
+}
+
+function renderVerbRow(verb) {
+    const columns = ['infinitive', 'second_third_infinitive', 'preterit', 'perfekt', 'translation'];
+    const cells = columns.map(column => `
+        <td data-editable="false">
+            <div>${escapeHtml(String(verb[column] ?? ''))}</div>
+        </td>`).join('');
+    return `<tr class="word_row">${cells}</tr>`;
+}
+
+
+
+// BULK CSV/TSV IMPORT
+function setupWordImport() {
+    document.querySelectorAll('.import-form').forEach(form => {
+        form.addEventListener('submit', async (e) => {
+            e.preventDefault();
+            const body = new FormData(form);
+            body.append('table', form.dataset.table);
+
+            try {
+                const res = await fetchWithCsrf(form.action, { method: 'POST', body: body });
+                const data = await res.json();
+                if (res.ok) {
+                    const details = `${data.duplicates} doppelt, ${data.rejected} ungültig`;
+                    await showTemporaryMessage(`${data.message} (${details})`, data.category || 'success', 2500);
+                    if (data.reload) location.reload();
+                } else {
+                    await showTemporaryMessage(data.error || 'Import fehlgeschlagen', 'error');
+                }
+            } catch (err) {
+                showTemporaryMessage('Server error', 'error');
+            }
+        });
+    });
+}
+
+
+
+// SPACED REPETITION REVIEW
+function setupReview() {
+    const card = document.getElementById('review-card');
+    if (!card) return;
+
+    const tableSelect = document.getElementById('review-table');
+    const front = document.getElementById('review-front');
+    const back = document.getElementById('review-back');
+    const showBtn = document.getElementById('review-show');
+    const grades = document.getElementById('review-grades');
+    const empty = document.getElementById('review-empty');
+    let queue = [];
+
+    const showCard = () => {
+        const current = queue[0];
+        card.classList.toggle('d-none', !current);
+        empty.classList.toggle('d-none', !!current);
+        if (!current) return;
+
+        front.innerText = current.front;
+        back.innerText = current.back.join(' · ');
+        back.classList.add('d-none');
+        grades.classList.add('d-none');
+        showBtn.classList.remove('d-none');
+    };
+
+    const loadCards = async () => {
+        const params = new URLSearchParams({ table: tableSelect.value, limit: 20 });
+        try {
+            const res = await fetch(`/review/due?${params}`, { credentials: 'same-origin' });
+            const data = await res.json();
+            queue = res.ok ? data.cards : [];
+        } catch (err) {
+            queue = [];
+        }
+        showCard();
+    };
+
+    showBtn.addEventListener('click', () => {
+        back.classList.remove('d-none');
+        grades.classList.remove('d-none');
+        showBtn.classList.add('d-none');
+    });
+
+    grades.querySelectorAll('[data-grade]').forEach(btn => {
+        btn.addEventListener('click', async () => {
+            const current = queue.shift();
+            if (!current) return;
+            const { ok, data } = await postJSON('/review/grade', {
+                table: tableSelect.value, id: current.id, grade: Number(btn.dataset.grade)
+            });
+            if (!ok) showTemporaryMessage(data.error || 'Fehler', 'error');
+            if (queue.length) showCard();
+            else loadCards();
         });
     });
+
+    tableSelect.addEventListener('change', loadCards);
+    loadCards();
 }
 
 
@@ -224,10 +428,18 @@ function setupLongPressEditing() {
 
 
 // OPEN NOTES EDIT MODAL
-function openEditModal(noteId) {
+async function openEditModal(noteId) {
     const modalElement = document.getElementById('edit-modal');
     if (!modalElement) return;
 
+    // the list only carries a preview; editing it would save the preview as the body
+    const loaded = await loadFullNote(noteId);
+    const header = document.querySelector(`.note-header[data-note-id="${noteId}"]`);
+    if (!loaded || header?.dataset.truncated === '1') {
+        alert('Die Notiz konnte nicht geladen werden. Bitte versuche es erneut.');
+        return;
+    }
+
     const modal = new bootstrap.Modal(modalElement);
 
     const titleEl = document.getElementById(`note-title-${noteId}`);
@@ -343,7 +555,7 @@ function enableInlineEdit(cell) {
     const oldValue = div.innerText.trim();
     const wordId = cell.dataset.wordId;
     const column = cell.dataset.column;
-    const table = cell.dataset.table || 'GermanWords';
+    const table = cell.closest('tbody').dataset.table || 'GermanWords';
 
     div.setAttribute('contenteditable', 'true');
     div.focus();
@@ -370,30 +582,12 @@ function enableInlineEdit(cell) {
         if (revert) div.innerText = oldValue;
     };
 
-    const saveChanges = async () => {
+    const saveChanges = () => {
         const newValue = div.innerText.trim();
         finishEditing(newValue === oldValue || newValue === '');
         if (newValue === oldValue || newValue === '') return;
 
-            try {
-                const result = await fetchWithCsrf('/dictionary/update', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json', 'X-CSRFToken': csrfToken },
-                body: JSON.stringify({ id: wordId, column: column, value: newValue, table: table })
-            });
-
-            const data = await result.json();
-            if (result.ok) {
-                await showTemporaryMessage(data.message || 'Saved', (data.category || 'success'));
-                if (data.reload) location.reload();
-            } else {
-                div.innerText = oldValue;
-                await showTemporaryMessage(data.error || 'Save failed', 'error');
-            }
-        } catch (err) {
-            div.innerText = oldValue;
-            showTemporaryMessage('Server error', 'error');
-        }
+        queueWordEdit({ table: table, id: wordId, column: column, value: newValue, div: div, oldValue: oldValue });
     };
 
     div.addEventListener('blur', () => saveChanges(), { once: true });
@@ -414,6 +608,241 @@ function enableInlineEdit(cell) {
 
 
 
+// BATCHED INLINE EDITS (coalesced into /dictionary/update/batch)
+const pendingWordEdits = new Map();
+let wordEditTimer = null;
+
+function queueWordEdit(edit) {
+    const key = `${edit.table}:${edit.id}:${edit.column}`;
+    const queued = pendingWordEdits.get(key);
+    // keep the value from before the first queued edit so a failed batch can revert it
+    if (queued) edit.oldValue = queued.oldValue;
+    pendingWordEdits.set(key, edit);
+
+    clearTimeout(wordEditTimer);
+    wordEditTimer = setTimeout(flushWordEdits, 800);
+}
+
+async function flushWordEdits(keepalive = false) {
+    clearTimeout(wordEditTimer);
+    if (!pendingWordEdits.size) return;
+
+    const edits = Array.from(pendingWordEdits.values());
+    pendingWordEdits.clear();
+
+    const byTable = {};
+    edits.forEach(edit => (byTable[edit.table] = byTable[edit.table] || []).push(edit));
+
+    for (const [table, tableEdits] of Object.entries(byTable)) {
+        const revert = () => tableEdits.forEach(edit => { edit.div.innerText = edit.oldValue; });
+        try {
+            const res = await fetchWithCsrf('/dictionary/update/batch', {
+                method: 'POST',
+                keepalive: keepalive,
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({
+                    table: table,
+                    changes: tableEdits.map(edit => ({ id: edit.id, column: edit.column, value: edit.value }))
+                })
+            });
+            if (keepalive) continue;
+
+            const data = await res.json();
+            if (res.ok) {
+                syncNow();
+                await showTemporaryMessage(data.message || 'Saved', (data.category || 'success'));
+                if (data.reload) location.reload();
+            } else {
+                revert();
+                await showTemporaryMessage(data.error || 'Save failed', 'error');
+            }
+        } catch (err) {
+            revert();
+            showTemporaryMessage('Server error', 'error');
+        }
+    }
+}
+
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') flushWordEdits(true);
+});
+
+
+
+// OFFLINE SYNC (IndexedDB mirror of /sync deltas, service worker for pages and assets)
+const SYNC_TABLES = ['GermanWords', 'SchweizWords', 'Notes'];
+const LOCAL_PAGE_SIZE = 100;
+let syncDbPromise = null;
+let syncRunning = null;
+
+function setupOfflineSync() {
+    if ('serviceWorker' in navigator) {
+        navigator.serviceWorker.register('/sw.js').catch(err => console.error('Service worker failed:', err));
+    }
+
+    syncNow().then(() => {
+        if (!navigator.onLine) renderLocalFirstPage();
+    });
+    window.addEventListener('online', () => syncNow());
+    document.addEventListener('visibilitychange', () => {
+        if (document.visibilityState === 'visible') syncNow();
+    });
+}
+
+function openSyncDb() {
+    if (!('indexedDB' in window)) return Promise.resolve(null);
+    if (!syncDbPromise) {
+        syncDbPromise = new Promise(resolve => {
+            const request = indexedDB.open('golden-gate', 1);
+            request.onupgradeneeded = () => {
+                SYNC_TABLES.forEach(table => {
+                    const store = request.result.createObjectStore(table, { keyPath: 'id' });
+                    store.createIndex('position', table === 'Notes' ? 'created_at' : 'user_word_id');
+                });
+                request.result.createObjectStore('meta');
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => resolve(null);
+        });
+    }
+    return syncDbPromise;
+}
+
+function idbRequest(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+function idbDone(tx) {
+    return new Promise((resolve, reject) => {
+        tx.oncomplete = () => resolve();
+        tx.onerror = tx.onabort = () => reject(tx.error);
+    });
+}
+
+async function getMeta(db, key) {
+    return idbRequest(db.transaction('meta').objectStore('meta').get(key));
+}
+
+function syncNow() {
+    // concurrent callers share the running sync
+    if (!syncRunning) {
+        syncRunning = runSync()
+            .catch(err => { console.error('Sync failed:', err); return false; })
+            .finally(() => { syncRunning = null; });
+    }
+    return syncRunning;
+}
+
+async function runSync() {
+    const db = await openSyncDb();
+    if (!db) return false;
+
+    // another account (or none, after logout) must not see this device's copy
+    const userId = document.body.dataset.userId || '';
+    const owner = await getMeta(db, 'user_id');
+    if (owner !== undefined && owner !== userId) {
+        const tx = db.transaction([...SYNC_TABLES, 'meta'], 'readwrite');
+        [...SYNC_TABLES, 'meta'].forEach(name => tx.objectStore(name).clear());
+        await idbDone(tx);
+        if ('caches' in window) await caches.delete('golden-gate-pages-v1');
+    }
+    if (!userId || !navigator.onLine) return false;
+
+    const cursors = (await getMeta(db, 'cursors')) || {};
+    let more = true;
+    while (more) {
+        const res = await fetch(`/sync?${new URLSearchParams(cursors)}`, { credentials: 'same-origin' });
+        if (!res.ok || res.redirected) return false;
+        const data = await res.json();
+
+        more = false;
+        const tx = db.transaction([...SYNC_TABLES, 'meta'], 'readwrite');
+        Object.entries(data.tables).forEach(([table, delta]) => {
+            const store = tx.objectStore(table);
+            if (delta.reset) store.clear();
+            // deletes first: SQLite may hand a deleted id to a new row
+            delta.deletes.forEach(id => store.delete(id));
+            delta.upserts.forEach(row => store.put(row));
+            cursors[table] = delta.cursor;
+            more = more || delta.more;
+        });
+        const meta = tx.objectStore('meta');
+        meta.put(cursors, 'cursors');
+        meta.put(userId, 'user_id');
+        meta.put(!more, 'complete');
+        await idbDone(tx);
+    }
+    return true;
+}
+
+async function readLocalRows(table, range, limit) {
+    // rows of a synced table in position order, or null without a complete copy
+    if (syncRunning) await syncRunning;
+    const db = await openSyncDb();
+    if (!db || !(await getMeta(db, 'complete'))) return null;
+
+    return new Promise((resolve, reject) => {
+        const rows = [];
+        const request = db.transaction(table).objectStore(table).index('position').openCursor(range);
+        request.onsuccess = () => {
+            const cursor = request.result;
+            if (cursor && rows.length < limit) {
+                rows.push(cursor.value);
+                cursor.continue();
+            } else {
+                resolve(rows);
+            }
+        };
+        request.onerror = () => reject(request.error);
+    });
+}
+
+async function localWordsPage(table, after, offset) {
+    const rows = await readLocalRows(table, IDBKeyRange.lowerBound(after, true), LOCAL_PAGE_SIZE + 1);
+    if (!rows) return null;
+
+    const more = rows.length > LOCAL_PAGE_SIZE;
+    const words = rows.slice(0, LOCAL_PAGE_SIZE).map((word, i) => ({ ...word, ordinal: offset + i + 1 }));
+    return { words: words, next_cursor: more ? words[words.length - 1].user_word_id : null };
+}
+
+async function localRow(table, id) {
+    const db = await openSyncDb();
+    if (!db || !(await getMeta(db, 'complete'))) return null;
+    return (await idbRequest(db.transaction(table).objectStore(table).get(id))) || null;
+}
+
+async function searchLocalWords(table, query) {
+    const rows = await readLocalRows(table, null, Infinity);
+    if (!rows) return [];
+
+    const needle = query.toLowerCase();
+    return rows
+        .map((word, i) => ({ ...word, ordinal: i + 1 }))
+        .filter(word => WORD_TABLE_COLUMNS[table].some(column => String(word[column] || '').toLowerCase().includes(needle)))
+        .slice(0, 50);
+}
+
+async function renderLocalFirstPage() {
+    // the page came from the service worker cache, so its rows may be old
+    const tbody = document.querySelector('tbody[data-next-cursor]');
+    if (!tbody || !WORD_TABLE_COLUMNS[tbody.dataset.table]) return;
+
+    const data = await localWordsPage(tbody.dataset.table, -Infinity, 0);
+    if (!data) return;
+
+    const sentinel = tbody.querySelector('.page-sentinel');
+    tbody.querySelectorAll('.word_row').forEach(row => row.remove());
+    tbody.insertAdjacentHTML('afterbegin', data.words.map(word => renderWordRow(word, tbody.dataset.table, tbody.dataset.deleteUrl)).join(''));
+    tbody.dataset.nextCursor = data.next_cursor === null ? '' : data.next_cursor;
+    if (sentinel) tbody.appendChild(sentinel);
+}
+
+
+
 // UTILITIES
 function toggleVisibility(td) {
     if (td.dataset && td.dataset.disableToggle === '1') return;
@@ -475,21 +904,18 @@ function autoDismissFlashAlerts(timeoutMs = 1500) {
 
 
 
-function insertNoteIntoDom(note) {
-    if (!note || !note.id) return;
-    const accordion = document.getElementById('accordion-notes');
-    if (!accordion) return;
-
+function noteItemHtml(note) {
     const id = note.id;
     const title = escapeHtml(note.title || '');
-    const body = escapeHtml(note.body || '').replace(/\n/g, '<br>');
+    const truncated = note.body === undefined && note.truncated;
+    const body = escapeHtml(note.body !== undefined ? note.body : (note.preview || ''));
     const csrf = getCsrfToken() || '';
 
-    const html = `
+    return `
     <div class="accordion-item">
       <h2 class="accordion-header" id="heading-${id}">
         <div class="accordion-button collapsed d-flex align-items-center note-header"
-             data-note-id="${id}" data-note-title="${title}" data-note-body="${escapeHtml(note.body||'') }"
+             data-note-id="${id}" data-note-title="${title}" data-truncated="${truncated ? '1' : '0'}"
              data-bs-toggle="collapse" data-bs-target="#collapse-${id}" aria-expanded="false" aria-controls="collapse-${id}" style="cursor: pointer;">
           <span class="flex-grow-1 w-100">${title}</span>
           <form method="POST" action="/delete_note" onsubmit="return confirm('Willst du diese Notiz löschen?')" onclick="event.stopPropagation();">
@@ -502,15 +928,21 @@ function insertNoteIntoDom(note) {
       <div id="collapse-${id}" class="accordion-collapse collapse" aria-labelledby="heading-${id}" data-bs-parent="#accordion-notes">
         <div class="accordion-body">
             <div id="note-title-${id}" class="d-none">${title}</div>
-            <div id="note-body-${id}" class="d-none">${escapeHtml(note.body||'')}</div>
-            ${body}
+            <div id="note-body-${id}" class="d-none">${body}</div>
+            <div class="note-content">${body}${truncated ? '…' : ''}</div>
         </div>
       </div>
     </div>`;
+}
+
+function insertNoteIntoDom(note) {
+    if (!note || !note.id) return;
+    const accordion = document.getElementById('accordion-notes');
+    if (!accordion) return;
 
-    accordion.insertAdjacentHTML('afterbegin', html);
+    accordion.insertAdjacentHTML('afterbegin', noteItemHtml(note));
 
-    const newHeader = document.querySelector(`.note-header[data-note-id="${id}"]`);
+    const newHeader = document.querySelector(`.note-header[data-note-id="${note.id}"]`);
     if (newHeader) {
         setupLongPressForHeader(newHeader);
     }
@@ -568,7 +1000,7 @@ function updateNoteInDom(note) {
         const span = header.querySelector('span');
         if (span) span.innerText = note.title;
         header.dataset.noteTitle = note.title;
-        header.dataset.noteBody = note.body;
+        header.dataset.truncated = '0';
     }
 
     const titleEl = document.getElementById(`note-title-${id}`);
@@ -577,16 +1009,133 @@ function updateNoteInDom(note) {
     if (titleEl) titleEl.innerText = note.title;
     if (bodyEl) bodyEl.innerText = note.body;
     if (collapseBody) {
-        // replace newlines with <br>
-        const rendered = escapeHtml(note.body || '').replace(/\n/g, '<br>');
         // Keep the hidden markers then insert rendered content
         const hiddenTitleHtml = `<div id="note-title-${id}" class="d-none">${escapeHtml(note.title)}</div>`;
         const hiddenBodyHtml = `<div id="note-body-${id}" class="d-none">${escapeHtml(note.body)}</div>`;
-        collapseBody.innerHTML = hiddenTitleHtml + hiddenBodyHtml + rendered;
+        collapseBody.innerHTML = hiddenTitleHtml + hiddenBodyHtml + `<div class="note-content">${escapeHtml(note.body)}</div>`;
     }
 }
 
 
+
+// NOTES FULL-TEXT SEARCH (debounced requests to /notes/search)
+function setupNotesSearch(accordion, debounceMs = 250) {
+    const input = document.getElementById('search_input_notes');
+    if (!input) return;
+
+    let timer = null;
+    let originalItems = null;
+    let latestRequest = 0;
+
+    input.addEventListener('input', () => {
+        clearTimeout(timer);
+        timer = setTimeout(async () => {
+            const query = input.value.trim();
+
+            if (!query) {
+                if (originalItems) accordion.replaceChildren(...originalItems);
+                originalItems = null;
+                return;
+            }
+
+            const requestId = ++latestRequest;
+            const params = new URLSearchParams({ q: query });
+            try {
+                const res = await fetch(`/notes/search?${params}`, { credentials: 'same-origin' });
+                if (!res.ok || requestId !== latestRequest) return;
+                const data = await res.json();
+
+                if (!originalItems) originalItems = Array.from(accordion.children);
+                accordion.innerHTML = data.notes.map(note => noteItemHtml({ id: note.id, title: '', preview: '', truncated: true })).join('');
+                data.notes.forEach(note => {
+                    // title_html and snippet_html are escaped server-side, only <mark> is markup
+                    const header = accordion.querySelector(`.note-header[data-note-id="${note.id}"]`);
+                    header.querySelector('span').innerHTML = note.title_html;
+                    accordion.querySelector(`#collapse-${note.id} .note-content`).innerHTML = note.snippet_html;
+                    document.getElementById(`note-title-${note.id}`).innerHTML = note.title_html;
+                    setupLongPressForHeader(header);
+                });
+            } catch (err) {
+                console.error('Notes search failed:', err);
+            }
+        }, debounceMs);
+    });
+}
+
+
+
+// LAZY NOTES FEED (preview pages from /notes/page, full bodies from /notes/<id>)
+// resolves to true once the note's full body is in the DOM
+async function loadFullNote(noteId) {
+    const header = document.querySelector(`.note-header[data-note-id="${noteId}"]`);
+    if (!header) return false;
+    if (header.dataset.truncated !== '1') return true;
+
+    const local = await localRow('Notes', Number(noteId));
+    if (local) {
+        updateNoteInDom(local);
+        return true;
+    }
+
+    try {
+        const res = await fetch(`/notes/${noteId}`, { credentials: 'same-origin' });
+        if (!res.ok) return false;
+        const data = await res.json();
+        updateNoteInDom(data.note);
+        return true;
+    } catch (err) {
+        console.error('Loading note failed:', err);
+        return false;
+    }
+}
+
+function setupNotesFeed() {
+    const accordion = document.getElementById('accordion-notes');
+    if (!accordion) return;
+
+    accordion.addEventListener('show.bs.collapse', (e) => {
+        const noteId = e.target.id.replace('collapse-', '');
+        loadFullNote(noteId);
+    });
+
+    setupNotesSearch(accordion);
+
+    if (!accordion.dataset.nextCursor || !('IntersectionObserver' in window)) return;
+
+    const sentinel = document.createElement('div');
+    sentinel.className = 'page-sentinel';
+    accordion.appendChild(sentinel);
+
+    let loading = false;
+    const observer = new IntersectionObserver(async (entries) => {
+        if (loading || !entries.some(entry => entry.isIntersecting)) return;
+        loading = true;
+        try {
+            const params = new URLSearchParams({ cursor: accordion.dataset.nextCursor });
+            const res = await fetch(`/notes/page?${params}`, { credentials: 'same-origin' });
+            const data = res.ok ? await res.json() : { notes: [], next_cursor: null };
+
+            sentinel.insertAdjacentHTML('beforebegin', data.notes.map(noteItemHtml).join(''));
+            data.notes.forEach(note => {
+                const header = accordion.querySelector(`.note-header[data-note-id="${note.id}"]`);
+                if (header) setupLongPressForHeader(header);
+            });
+            accordion.dataset.nextCursor = data.next_cursor || '';
+        } catch (err) {
+            console.error('Loading notes page failed:', err);
+            accordion.dataset.nextCursor = '';
+        }
+        loading = false;
+        if (!accordion.dataset.nextCursor) {
+            observer.disconnect();
+            sentinel.remove();
+        }
+    }, { root: accordion, rootMargin: '200px' });
+
+    observer.observe(sentinel);
+}
+
+
 function setupPasswordToggles() {
     const toggles = document.querySelectorAll('.btn-toggle-password');
     if (!toggles.length) return;
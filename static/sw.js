@@ -0,0 +1,52 @@
+// SERVICE WORKER: cache-first for fingerprinted assets, network-first for pages
+const ASSET_CACHE = 'golden-gate-assets-v1';
+const PAGE_CACHE = 'golden-gate-pages-v1';
+
+self.addEventListener('install', () => self.skipWaiting());
+
+self.addEventListener('activate', (event) => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(keys
+                .filter(key => ![ASSET_CACHE, PAGE_CACHE].includes(key))
+                .map(key => caches.delete(key))))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', (event) => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+    const url = new URL(request.url);
+
+    // /assets/ names change with their content and the CDN urls are versioned
+    if (url.pathname.startsWith('/assets/') || url.hostname === 'cdn.jsdelivr.net') {
+        event.respondWith(cacheFirst(request));
+    } else if (request.mode === 'navigate' && url.origin === self.location.origin) {
+        event.respondWith(networkFirst(request));
+    }
+    // JSON endpoints (/sync, /dictionary/page, ...) go straight to the network;
+    // their offline copy lives in IndexedDB
+});
+
+async function cacheFirst(request) {
+    const cache = await caches.open(ASSET_CACHE);
+    const cached = await cache.match(request);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok) cache.put(request, response.clone());
+    return response;
+}
+
+async function networkFirst(request) {
+    const cache = await caches.open(PAGE_CACHE);
+    try {
+        const response = await fetch(request);
+        if (response.ok && !response.redirected) cache.put(request, response.clone());
+        return response;
+    } catch (err) {
+        const cached = await cache.match(request);
+        if (cached) return cached;
+        throw err;
+    }
+}